@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Adaptive PDF text extraction for the Insurance Claims Processing System.
+Each page goes through the cheapest strategy that works: the layout text
+layer, a plain (non-layout) text layer retry, then a low-DPI render for
+blank-page triage and OCR; a page is rendered and OCR'd again at high DPI
+only when low-DPI confidence stays low.
+
+Usage:
+    python adaptive_ocr.py policy.pdf --low-dpi 150 --high-dpi 300
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional, Tuple
+
+import pdfplumber
+import pytesseract
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image
+
+from jobs import report_progress
+from metrics import OCR_PAGES, OCR_PAGE_SECONDS, span
+
+logger = logging.getLogger(__name__)
+
+# Pages with no text or images and fewer vector objects than this are blank
+MAX_BLANK_VECTOR_OBJECTS = 50
+
+
+@dataclass
+class PageReport:
+    """How one page was extracted and what it cost."""
+    page: int
+    strategy: str
+    seconds: float
+    dpi: Optional[int] = None
+    confidence: Optional[float] = None
+    words: int = 0
+    ink_ratio: Optional[float] = None
+
+
+def ink_ratio(image: Image.Image, contrast: int = 64, margin: float = 0.03) -> float:
+    """
+    Fraction of pixels at least ``contrast`` grey levels darker than the page
+    background (its median level), ignoring a margin where scanner edges show
+    up. Measuring against the background keeps faint or grey scans from
+    reading as blank.
+    """
+    gray = image.convert("L")
+    width, height = gray.size
+    dx, dy = int(width * margin), int(height * margin)
+    if width - 2 * dx > 0 and height - 2 * dy > 0:
+        gray = gray.crop((dx, dy, width - dx, height - dy))
+    histogram = gray.histogram()
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    seen, background = 0, 255
+    for level, count in enumerate(histogram):
+        seen += count
+        if 2 * seen >= total:
+            background = level
+            break
+    return sum(histogram[:max(background - contrast, 0)]) / total
+
+
+def text_from_data(data: dict) -> Tuple[str, float, int]:
+    """Rebuild line-broken text from tesseract image_to_data; returns (text, mean confidence, words)."""
+    lines, confidences = {}, []
+    for i, word in enumerate(data.get("text", [])):
+        word = (word or "").strip()
+        confidence = float(data["conf"][i])
+        if not word or confidence < 0:
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        confidences.append(confidence)
+
+    text, previous = [], None
+    for key in sorted(lines):
+        if previous is not None and key[:2] != previous[:2]:
+            text.append("")  # Blank line between paragraphs
+        text.append(" ".join(lines[key]))
+        previous = key
+    mean = sum(confidences) / len(confidences) if confidences else 0.0
+    return "\n".join(text), mean, len(confidences)
+
+
+class AdaptiveOCR:
+    """Per-page text layer, triage and DPI-escalating OCR for PDFs."""
+
+    def __init__(self, low_dpi: int = 150, high_dpi: int = 300, min_confidence: float = 75.0,
+                 min_words: int = 3, blank_ink_ratio: float = 0.0005, lang: str = 'eng'):
+        self.low_dpi = low_dpi
+        self.high_dpi = high_dpi
+        self.min_confidence = min_confidence
+        self.min_words = min_words
+        self.blank_ink_ratio = blank_ink_ratio
+        self.lang = lang
+
+    def extract_pdf(self, file_path: str) -> Tuple[str, List[PageReport]]:
+        """Text of every page and a report per page; unreadable PDFs are fully rasterised."""
+        try:
+            with pdfplumber.open(file_path) as pdf:
+                texts, reports = [], []
+                for page_num, page in enumerate(pdf.pages, 1):
+                    try:
+                        text, report = self._extract_page(
+                            page_num,
+                            lambda: self._text_layer(page),
+                            lambda: self._blank_without_raster(page),
+                            lambda dpi: page.to_image(resolution=dpi).original,
+                        )
+                    except Exception as e:
+                        logger.warning(f"Error processing page {page_num}: {e}")
+                        text, report = "", PageReport(page_num, "failed", 0.0)
+                        self._record(report)
+                    texts.append(text)
+                    reports.append(report)
+                    report_progress("page_extracted", page=page_num, pages=len(pdf.pages),
+                                    strategy=report.strategy)
+        except Exception as e:
+            logger.warning(f"pdfplumber failed for {file_path}: {e}. Attempting full OCR.")
+            return self.extract_scanned(file_path)
+
+        self._log_summary(file_path, reports)
+        return "\n".join(texts).strip(), reports
+
+    def extract_scanned(self, pdf_path: str) -> Tuple[str, List[PageReport]]:
+        """OCR a PDF without a usable text layer, one page at a time."""
+        try:
+            pages = pdfinfo_from_path(pdf_path)["Pages"]
+        except Exception as e:
+            logger.error(f"OCR extraction failed for {pdf_path}: {e}")
+            return "", []
+
+        def render(page_num: int, dpi: int) -> Image.Image:
+            with span("rasterize"):
+                return convert_from_path(pdf_path, dpi=dpi, first_page=page_num, last_page=page_num)[0]
+
+        texts, reports = [], []
+        for page_num in range(1, pages + 1):
+            try:
+                text, report = self._extract_page(
+                    page_num, lambda: ("", ""), lambda: False, lambda dpi, n=page_num: render(n, dpi)
+                )
+            except Exception as e:
+                logger.warning(f"OCR failed for page {page_num}: {e}")
+                text, report = "", PageReport(page_num, "failed", 0.0)
+                self._record(report)
+            texts.append(text)
+            reports.append(report)
+            report_progress("page_extracted", page=page_num, pages=pages, strategy=report.strategy)
+
+        self._log_summary(pdf_path, reports)
+        return "\n".join(texts).strip(), reports
+
+    def ocr_image(self, image: Image.Image) -> Tuple[str, float, int]:
+        """OCR one page image; returns (text, mean word confidence, words)."""
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        with span("ocr"):
+            data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
+        return text_from_data(data)
+
+    def _extract_page(self, page_num: int, text_layer: Callable[[], Tuple[str, str]],
+                      blank: Callable[[], bool],
+                      render: Callable[[int], Image.Image]) -> Tuple[str, PageReport]:
+        start = time.perf_counter()
+        text, strategy = text_layer()
+        if text.strip():
+            return text, self._record(PageReport(page_num, strategy, time.perf_counter() - start))
+
+        if blank():
+            return "", self._record(PageReport(page_num, "blank", time.perf_counter() - start))
+
+        # Most pages stop at the low-DPI render; only escalations pay for a high-DPI one
+        low_image = render(self.low_dpi)
+        ink = ink_ratio(low_image)
+        if ink < self.blank_ink_ratio:
+            report = PageReport(page_num, "blank", time.perf_counter() - start, ink_ratio=round(ink, 4))
+            return "", self._record(report)
+
+        text, confidence, words = self.ocr_image(low_image)
+        strategy, dpi = "ocr_low", self.low_dpi
+        if words < self.min_words:
+            # Logos and stamps: almost nothing readable, higher DPI will not help
+            strategy = "sparse"
+        elif confidence < self.min_confidence and self.high_dpi > self.low_dpi:
+            high = self.ocr_image(render(self.high_dpi))
+            if high[1] >= confidence:
+                (text, confidence, words), strategy, dpi = high, "ocr_high", self.high_dpi
+            else:
+                strategy = "ocr_low_kept"
+
+        return text, self._record(PageReport(
+            page_num, strategy, time.perf_counter() - start, dpi=dpi,
+            confidence=round(confidence, 1), words=words, ink_ratio=round(ink, 4)
+        ))
+
+    @staticmethod
+    def _text_layer(page) -> Tuple[str, str]:
+        with span("pdf_extract"):
+            try:
+                text = page.extract_text(layout=True) or ""
+                if text.strip():
+                    return text, "text_layer"
+            except Exception as e:
+                logger.debug(f"Layout extraction failed on page {page.page_number}: {e}")
+            # Layout mode can fail or come back empty on pages that do have characters
+            if page.chars:
+                return page.extract_text() or "", "text_layer_plain"
+        return "", ""
+
+    @staticmethod
+    def _blank_without_raster(page) -> bool:
+        if page.chars or page.images:
+            return False
+        return len(page.lines) + len(page.rects) + len(page.curves) < MAX_BLANK_VECTOR_OBJECTS
+
+    @staticmethod
+    def _record(report: PageReport) -> PageReport:
+        report.seconds = round(report.seconds, 4)
+        OCR_PAGES.inc(strategy=report.strategy)
+        OCR_PAGE_SECONDS.observe(report.seconds, strategy=report.strategy)
+        logger.debug(f"Page {report.page}: {report.strategy} in {report.seconds:.3f}s "
+                     f"(dpi={report.dpi}, confidence={report.confidence})")
+        return report
+
+    @staticmethod
+    def _log_summary(file_path: str, reports: List[PageReport]):
+        counts = {}
+        for report in reports:
+            counts[report.strategy] = counts.get(report.strategy, 0) + 1
+        seconds = sum(report.seconds for report in reports)
+        logger.info(f"Extracted {len(reports)} pages of {file_path} in {seconds:.2f}s: {counts}",
+                    extra={"sample": True})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the extraction strategy and time per PDF page")
+    parser.add_argument("pdf", help="PDF to extract")
+    parser.add_argument("--low-dpi", type=int, default=150)
+    parser.add_argument("--high-dpi", type=int, default=300)
+    parser.add_argument("--min-confidence", type=float, default=75.0)
+    parser.add_argument("--blank-ink-ratio", type=float, default=0.0005)
+    parser.add_argument("--scanned", action="store_true", help="Ignore the text layer and OCR every page")
+    args = parser.parse_args()
+
+    ocr = AdaptiveOCR(low_dpi=args.low_dpi, high_dpi=args.high_dpi,
+                      min_confidence=args.min_confidence, blank_ink_ratio=args.blank_ink_ratio)
+    extract = ocr.extract_scanned if args.scanned else ocr.extract_pdf
+    _, reports = extract(args.pdf)
+
+    print(f"{'page':>5} {'strategy':<17} {'dpi':>5} {'conf':>6} {'words':>6} {'ink':>7} {'ms':>9}")
+    for report in reports:
+        row = asdict(report)
+        print(f"{row['page']:>5} {row['strategy']:<17} {row['dpi'] or '-':>5} "
+              f"{row['confidence'] if row['confidence'] is not None else '-':>6} {row['words']:>6} "
+              f"{row['ink_ratio'] if row['ink_ratio'] is not None else '-':>7} {row['seconds'] * 1000:>9.1f}")
+    print(f"Total: {sum(report.seconds for report in reports):.2f}s over {len(reports)} pages")
+
+
+if __name__ == "__main__":
+    main()
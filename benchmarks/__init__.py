@@ -0,0 +1,3 @@
+"""
+Benchmarks and load generation for the Insurance Claims Processing System.
+"""
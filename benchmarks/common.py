@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the benchmark suite: latency summaries, RSS and result files.
+"""
+
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+RESULTS_DIR = Path("bench_results")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Summarize latencies in seconds as milliseconds."""
+    return {
+        "runs": len(latencies),
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(1000 * percentile(latencies, 50), 3),
+        "p95_ms": round(1000 * percentile(latencies, 95), 3),
+        "p99_ms": round(1000 * percentile(latencies, 99), 3),
+        "max_ms": round(1000 * max(latencies), 3) if latencies else 0.0,
+    }
+
+
+def time_call(func, repeat: int) -> List[float]:
+    """Call func repeat times and return the wall-clock duration of each call."""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_revision() -> str:
+    """Short git revision of the working tree, if available."""
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(kind: str, payload: Dict[str, Any], output: str = None) -> Path:
+    """Write benchmark results with environment metadata to a JSON file."""
+    payload = {
+        "kind": kind,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.now().isoformat(),
+        **payload,
+    }
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results saved to {path}")
+    return path
+
+
+def print_table(results: Dict[str, Dict[str, float]]):
+    """Print latency summaries as an aligned table."""
+    print(f"{'benchmark':<45} {'runs':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    print("-" * 84)
+    for name, stats in results.items():
+        print(f"{name:<45} {stats['runs']:>5} {stats['p50_ms']:>10.2f} "
+              f"{stats['p95_ms']:>10.2f} {stats['p99_ms']:>10.2f}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files and flag latency regressions.
+
+Usage:
+    python -m benchmarks.compare bench_results/micro-old.json bench_results/micro-new.json --threshold 0.15
+"""
+
+import argparse
+import json
+import sys
+
+
+def flatten(results: dict) -> dict:
+    """Map benchmark name to its latency summary for micro and load results."""
+    if "latency" in results:
+        flat = {"load": results["latency"]}
+        flat.update({f"load[{lang}]": stats for lang, stats in results.get("latency_by_language", {}).items()})
+        return flat
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float, metric: str = "p95_ms") -> list:
+    """Return (name, old, new, change, regressed) for every benchmark in both runs; regressed is change > threshold."""
+    old_results = flatten(baseline["results"])
+    new_results = flatten(current["results"])
+    rows = []
+    for name in sorted(set(old_results) & set(new_results)):
+        old, new = old_results[name][metric], new_results[name][metric]
+        change = (new - old) / old if old else 0.0
+        rows.append((name, old, new, change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("baseline", help="Baseline result JSON")
+    parser.add_argument("current", help="Current result JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"])
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    print(f"{baseline.get('revision')} -> {current.get('revision')} ({args.metric})")
+    rows = compare(baseline, current, args.threshold, args.metric)
+    for name, old, new, change, regressed in rows:
+        marker = "❌" if regressed else "✅"
+        print(f"{marker} {name:<45} {old:>10.2f} -> {new:>10.2f} ms ({change:+.1%})")
+
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n📊 {regressions} regression(s) over {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Accuracy and latency of the tiered language detector against the original
+langdetect-only implementation on a multilingual set of claim queries.
+
+Usage:
+    python -m benchmarks.language --repeat 20
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+from langdetect import DetectorFactory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import save_results, summarize
+from language_detection import LanguageDetector, detect_with_langdetect
+
+SUPPORTED = ['en', 'es', 'fr', 'de', 'hi', 'zh', 'ar', 'ru', 'ja', 'pt', 'it', 'ko']
+
+TEST_SET = {
+    "en": [
+        "46-year-old male, knee surgery in Pune, 3-month-old insurance policy",
+        "Is cataract surgery covered under my policy after 2 years?",
+        "32 year old female, maternity care in Mumbai, 10 month policy",
+        "My father was hospitalised for dialysis, is the treatment covered?",
+        "Accident claim for a broken arm, policy is one month old",
+        "What is the waiting period for pre-existing conditions?",
+    ],
+    "hi": [
+        "46 वर्षीय पुरुष, पुणे में घुटने की सर्जरी, 3 महीने पुरानी बीमा पॉलिसी",
+        "क्या मेरी पॉलिसी में मोतियाबिंद की सर्जरी शामिल है?",
+        "32 वर्षीय महिला, मुंबई में प्रसूति देखभाल",
+        "दुर्घटना में हाथ टूट गया, क्या दावा मिलेगा?",
+        "पहले से मौजूद बीमारियों के लिए प्रतीक्षा अवधि क्या है?",
+        "डायलिसिस उपचार का खर्च",
+    ],
+    "es": [
+        "Hombre de 46 años, cirugía de rodilla en Pune, póliza de seguro de 3 meses",
+        "¿Está cubierta la cirugía de cataratas en mi póliza?",
+        "Mujer de 32 años, atención de maternidad en Mumbai",
+        "Reclamación por accidente, la póliza tiene un mes",
+        "¿Cuál es el periodo de espera para enfermedades preexistentes?",
+        "Tratamiento de diálisis para mi padre",
+    ],
+    "fr": [
+        "Homme de 46 ans, chirurgie du genou à Pune, police d'assurance de 3 mois",
+        "La chirurgie de la cataracte est-elle couverte par ma police ?",
+        "Femme de 32 ans, soins de maternité à Mumbai",
+        "Demande d'indemnisation pour un accident, la police a un mois",
+        "Quel est le délai de carence pour les maladies préexistantes ?",
+        "Traitement de dialyse pour mon père",
+    ],
+    "de": [
+        "46-jähriger Mann, Knieoperation in Pune, 3 Monate alte Versicherungspolice",
+        "Ist die Kataraktoperation in meiner Police enthalten?",
+        "32-jährige Frau, Mutterschaftsbetreuung in Mumbai",
+        "Unfallanspruch, die Police ist einen Monat alt",
+        "Wie lange ist die Wartezeit für Vorerkrankungen?",
+        "Dialysebehandlung für meinen Vater",
+    ],
+    "pt": [
+        "Homem de 46 anos, cirurgia no joelho em Pune, apólice de seguro de 3 meses",
+        "A cirurgia de catarata está coberta pela minha apólice?",
+        "Mulher de 32 anos, cuidados de maternidade em Mumbai",
+        "Pedido de indenização por acidente, a apólice tem um mês",
+        "Qual é o período de carência para doenças preexistentes?",
+        "Tratamento de diálise para o meu pai",
+    ],
+    "it": [
+        "Uomo di 46 anni, intervento al ginocchio a Pune, polizza assicurativa di 3 mesi",
+        "L'intervento di cataratta è coperto dalla mia polizza?",
+        "Donna di 32 anni, assistenza alla maternità a Mumbai",
+        "Richiesta di risarcimento per incidente, la polizza ha un mese",
+        "Qual è il periodo di attesa per le malattie preesistenti?",
+        "Trattamento di dialisi per mio padre",
+    ],
+    "zh": [
+        "46岁男性，在浦那进行膝盖手术，保险单已生效3个月",
+        "我的保单是否涵盖白内障手术？",
+        "32岁女性，在孟买接受产科护理",
+        "意外事故索赔，保单生效一个月",
+        "既往病症的等待期是多久？",
+        "我父亲的透析治疗费用",
+    ],
+    "ja": [
+        "46歳男性、プネーで膝の手術、保険加入から3か月",
+        "白内障の手術は私の保険でカバーされますか？",
+        "32歳女性、ムンバイでの出産ケア",
+        "事故の請求、保険は加入1か月です",
+        "既往症の待機期間はどのくらいですか？",
+        "父の透析治療の費用",
+    ],
+    "ko": [
+        "46세 남성, 푸네에서 무릎 수술, 가입 3개월 된 보험",
+        "백내장 수술이 제 보험에 포함되나요?",
+        "32세 여성, 뭄바이에서 출산 관리",
+        "사고 보험금 청구, 보험 가입 1개월",
+        "기존 질환의 대기 기간은 얼마입니까?",
+        "아버지의 투석 치료 비용",
+    ],
+    "ar": [
+        "رجل يبلغ من العمر 46 عامًا، جراحة الركبة في بونه، وثيقة تأمين عمرها 3 أشهر",
+        "هل تغطي وثيقتي جراحة إعتام عدسة العين؟",
+        "امرأة تبلغ من العمر 32 عامًا، رعاية الأمومة في مومباي",
+        "مطالبة بسبب حادث، عمر الوثيقة شهر واحد",
+        "ما هي فترة الانتظار للأمراض الموجودة مسبقًا؟",
+        "علاج غسيل الكلى لوالدي",
+    ],
+    "ru": [
+        "Мужчина 46 лет, операция на колене в Пуне, страховому полису 3 месяца",
+        "Покрывает ли мой полис операцию по удалению катаракты?",
+        "Женщина 32 лет, уход по беременности в Мумбаи",
+        "Заявление по несчастному случаю, полису один месяц",
+        "Каков период ожидания для ранее существовавших заболеваний?",
+        "Лечение диализом для моего отца",
+    ],
+}
+
+
+def original_detect(text: str) -> str:
+    """The langdetect-only implementation this detector replaced."""
+    try:
+        if not text or len(text.strip()) < 3:
+            return 'en'
+        text = re.sub(r'[^\w\s]', ' ', text)
+        text = text.replace('\n', ' ')[:1000]
+        detected = detect_with_langdetect(text)
+        return detected if detected in SUPPORTED else 'en'
+    except Exception:
+        return 'en'
+
+
+def evaluate(detect, samples, repeat: int) -> dict:
+    """Accuracy and per-call latency of a detector over the samples."""
+    correct, latencies, mistakes = 0, [], []
+    for expected, text in samples:
+        predicted = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            predicted = detect(text)
+            latencies.append(time.perf_counter() - start)
+        if predicted == expected:
+            correct += 1
+        else:
+            mistakes.append({"text": text, "expected": expected, "predicted": predicted})
+    return {"accuracy": round(correct / len(samples), 4), "latency": summarize(latencies), "mistakes": mistakes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare language detectors")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per sample (repeats exercise the memo)")
+    parser.add_argument("--output", help="Result JSON path (default: bench_results/language-<timestamp>.json)")
+    args = parser.parse_args()
+
+    DetectorFactory.seed = 0
+    samples = [(lang, text) for lang, texts in TEST_SET.items() for text in texts]
+
+    tiered = LanguageDetector(SUPPORTED)
+    methods = {}
+    for _, text in samples:
+        method = tiered.detect_with_method(text)[1]
+        methods[method] = methods.get(method, 0) + 1
+
+    results = {
+        "original": evaluate(original_detect, samples, args.repeat),
+        "tiered_uncached": evaluate(lambda text: tiered.detect_with_method(text)[0], samples, args.repeat),
+        "tiered_memoised": evaluate(tiered.detect, samples, args.repeat),
+    }
+
+    print(f"{len(samples)} samples, {len(TEST_SET)} languages, {args.repeat} calls each")
+    print(f"Tier decisions: {methods}")
+    for name, result in results.items():
+        latency = result["latency"]
+        print(f"{name:<18} accuracy {result['accuracy']:.1%}  p50 {latency['p50_ms']:.3f} ms  "
+              f"p99 {latency['p99_ms']:.3f} ms")
+        for mistake in result["mistakes"]:
+            print(f"    ❌ {mistake['expected']} -> {mistake['predicted']}: {mistake['text']}")
+    save_results("language", {"parameters": vars(args), "tiers": methods, "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
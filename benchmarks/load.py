@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Offline load generator for the /process-claim endpoint.
+Sends claims at a target request rate with a mix of query languages and
+document sizes, then reports throughput, latency percentiles and server RSS.
+The workload repeats the same claims, so requests bypass the result cache
+unless --use-cache is given.
+
+Usage:
+    python -m benchmarks.load --url http://127.0.0.1:8000 --rps 2 --duration 60
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import percentile, save_results, summarize
+from benchmarks.synthetic import QUERIES, generate
+
+
+def scrape_rss(url: str) -> float:
+    """Read process_resident_memory_bytes from the server's /metrics."""
+    try:
+        text = requests.get(f"{url}/metrics", timeout=5).text
+        match = re.search(r'^process_resident_memory_bytes (\S+)$', text, re.MULTILINE)
+        return float(match.group(1)) if match else 0.0
+    except requests.exceptions.RequestException:
+        return 0.0
+
+
+def send_claim(url: str, query: str, path: str, timeout: float, use_cache: bool = False) -> dict:
+    """POST one claim and return its latency, outcome and cache status."""
+    start = time.perf_counter()
+    cache = None
+    try:
+        with open(path, "rb") as f:
+            response = requests.post(
+                f"{url}/process-claim",
+                data={"query": query},
+                files={"file": (os.path.basename(path), f)},
+                headers={} if use_cache else {"X-Cache-Bypass": "1"},
+                timeout=timeout,
+            )
+        ok = response.status_code == 200 and "error" not in response.json()
+        status = response.status_code
+        cache = response.headers.get("X-Cache")
+    except requests.exceptions.RequestException as e:
+        ok, status = False, type(e).__name__
+    return {"latency": time.perf_counter() - start, "ok": ok, "status": status, "cache": cache}
+
+
+def run_load(url: str, rps: float, duration: float, workload: list, concurrency: int,
+             timeout: float, seed: int = 0, use_cache: bool = False) -> dict:
+    """Open-loop load: requests are scheduled at a fixed rate regardless of completions."""
+    rng = random.Random(seed)
+    results = []
+    results_lock = threading.Lock()
+    rss_samples = [scrape_rss(url)]
+    stop = threading.Event()
+
+    def sample_rss():
+        while not stop.wait(1.0):
+            rss_samples.append(scrape_rss(url))
+
+    def task(lang, size, query, path, scheduled):
+        outcome = send_claim(url, query, path, timeout, use_cache)
+        outcome.update({"lang": lang, "pages": size, "lag": time.perf_counter() - scheduled - outcome["latency"]})
+        with results_lock:
+            results.append(outcome)
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        sent = 0
+        while True:
+            scheduled = start + sent / rps
+            if scheduled - start >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task, *rng.choice(workload), scheduled)
+            sent += 1
+    elapsed = time.perf_counter() - start
+    stop.set()
+    rss_samples.append(scrape_rss(url))
+
+    latencies = [r["latency"] for r in results if r["ok"]]
+    by_lang, cache_statuses = {}, {}
+    for r in results:
+        by_lang.setdefault(r["lang"], []).append(r["latency"])
+        cache_statuses[str(r["cache"])] = cache_statuses.get(str(r["cache"]), 0) + 1
+
+    return {
+        "sent": sent,
+        "completed": len(latencies),
+        "errors": len(results) - len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "latency_by_language": {lang: summarize(values) for lang, values in sorted(by_lang.items())},
+        "cache_statuses": cache_statuses,
+        "max_schedule_lag_ms": round(1000 * max((r["lag"] for r in results), default=0.0), 3),
+        "server_rss_bytes": {
+            "start": rss_samples[0],
+            "max": max(rss_samples),
+            "p50": percentile(rss_samples, 50),
+            "end": rss_samples[-1],
+        },
+        "error_statuses": sorted({str(r["status"]) for r in results if not r["ok"]}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for /process-claim")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Python API base URL")
+    parser.add_argument("--rps", type=float, default=1.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to send load")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--languages", nargs="+", default=["en", "hi", "es", "fr", "zh", "ar"],
+                        choices=sorted(QUERIES), help="Query languages in the mix")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100], help="Text PDF sizes in the mix")
+    parser.add_argument("--scanned-pages", type=int, nargs="*", default=[], help="Scanned PDF sizes in the mix")
+    parser.add_argument("--data-dir", default="bench_data", help="Where synthetic policies are cached")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Let repeated claims hit the result cache (default: send X-Cache-Bypass)")
+    parser.add_argument("--output", help="Result JSON path (default: bench_results/load-<timestamp>.json)")
+    args = parser.parse_args()
+
+    documents = generate(args.data_dir, args.pages, args.scanned_pages)
+    workload = [
+        (lang, f"{pages}p{'-scanned' if kind == 'scanned' else ''}", QUERIES[lang], path)
+        for lang in args.languages
+        for kind in ("pdf", "scanned")
+        for pages, path in documents[kind].items()
+    ]
+
+    print(f"Sending {args.rps} req/s for {args.duration}s to {args.url} "
+          f"({len(args.languages)} languages, {len(workload) // len(args.languages)} documents)")
+    report = run_load(args.url, args.rps, args.duration, workload, args.concurrency, args.timeout,
+                      args.seed, args.use_cache)
+
+    latency = report["latency"]
+    print(f"Completed {report['completed']}/{report['sent']} ({report['errors']} errors) "
+          f"in {report['elapsed_s']}s: {report['throughput_rps']} req/s")
+    print(f"Latency p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, p99 {latency['p99_ms']:.1f} ms")
+    print(f"Cache statuses: {report['cache_statuses']}")
+    print(f"Server RSS max {report['server_rss_bytes']['max'] / 1024 / 1024:.1f} MiB")
+    save_results("load", {"parameters": vars(args), "results": report}, args.output)
+
+
+if __name__ == "__main__":
+    main()
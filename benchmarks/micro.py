@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the claim processing hot path.
+Times clean_text, parse_document, search_clauses, evaluate_decision and
+translate_text on synthetic policies and saves the results as JSON.
+
+Usage:
+    python -m benchmarks.micro --pages 10 100 1000 --scanned-pages 10 --repeat 5
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import peak_rss_bytes, print_table, save_results, summarize, time_call
+from benchmarks.synthetic import QUERIES, generate
+
+BENCH_QUERY = QUERIES["en"]
+
+
+def run(documents: dict, repeat: int, translate_langs: list) -> dict:
+    """Run every micro-benchmark and return latency summaries by name."""
+    # Importing the API module loads the models once for all benchmarks
+    from insurance_api import processor
+
+    results = {}
+    query_details = processor.parse_query(BENCH_QUERY, 'en')
+
+    for kind in ("txt", "pdf", "scanned"):
+        for pages, path in sorted(documents[kind].items()):
+            label = f"{kind}/{pages}p"
+            # Scanned documents are OCR-bound; a single cold run is representative
+            runs = 1 if kind == "scanned" else repeat
+
+            def parse_cold():
+                # Drop the embeddings, BM25 index and shared clause embeddings so every run rebuilds them
+                processor.release_document(path)
+                processor.reset_clause_registry()
+                return processor.parse_document(path)
+
+            results[f"parse_document[{label}]"] = summarize(time_call(parse_cold, runs))
+            clauses = processor.parse_document(path)
+
+            if kind == "txt":
+                raw_text = processor.extract_text(path)
+                results[f"clean_text[{label}]"] = summarize(
+                    time_call(lambda: processor.clean_text(raw_text), repeat))
+
+            search = lambda: processor.search_clauses(BENCH_QUERY, clauses, path)
+            results[f"search_clauses[{label}]"] = summarize(time_call(search, repeat))
+            relevant = search()
+            results[f"evaluate_decision[{label}]"] = summarize(
+                time_call(lambda: processor.evaluate_decision(query_details, relevant, BENCH_QUERY), repeat))
+
+    sample = "Coverage found in policy terms. Policy has 36-month waiting period."
+    for lang in translate_langs:
+        processor.get_translator(lang)  # Exclude model load time
+        results[f"translate_text[{lang}]"] = summarize(
+            time_call(lambda: processor.translate_text(sample, lang), repeat))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the claims pipeline")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000], help="Text document sizes")
+    parser.add_argument("--scanned-pages", type=int, nargs="*", default=[10, 100], help="Scanned PDF sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument("--translate", nargs="*", default=["hi", "es"], help="Target languages for translate_text")
+    parser.add_argument("--data-dir", default="bench_data", help="Where synthetic policies are cached")
+    parser.add_argument("--output", help="Result JSON path (default: bench_results/micro-<timestamp>.json)")
+    args = parser.parse_args()
+
+    documents = generate(args.data_dir, args.pages, args.scanned_pages)
+    results = run(documents, args.repeat, args.translate)
+
+    print_table(results)
+    rss = peak_rss_bytes()
+    print(f"\nPeak RSS: {rss / 1024 / 1024:.1f} MiB")
+    save_results("micro", {
+        "parameters": vars(args),
+        "peak_rss_bytes": rss,
+        "results": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
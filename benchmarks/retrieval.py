@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Latency and top-k quality of dense, BM25-prefiltered and hybrid clause retrieval.
+
+Each mode runs with its own configuration. "cold" is parse_document plus the
+first query with no cached embeddings or index, which is where the prefilter
+saves time by embedding only shortlisted clauses; "warm" is per-query search
+latency afterwards. Documents below Config.BM25_PREFILTER_MIN_CLAUSES are
+searched densely in prefilter mode, as in production.
+
+Queries name a procedure plus an exact term (a waiting period in months or a
+city); a clause is relevant when it contains both. Quality is precision@k
+against those labels and overlap with the dense-only top-k.
+
+Usage:
+    python -m benchmarks.retrieval --pages 10 100 --queries 50
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import print_table, save_results, summarize, time_call
+from benchmarks.synthetic import CITIES, PROCEDURES, generate
+
+MODES = ("dense", "prefilter", "hybrid")
+
+
+def make_queries(count: int, seed: int = 0) -> list:
+    """(query, required terms) pairs with an exact-match term."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        procedure = rng.choice(PROCEDURES)
+        if rng.random() < 0.5:
+            months = rng.choice([9, 12, 24, 36, 48])
+            queries.append((f"{procedure} {months}-month waiting period", [procedure, f"{months}-month"]))
+        else:
+            city = rng.choice(CITIES)
+            queries.append((f"cashless {procedure} in {city}", [procedure, city.lower()]))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dense, prefilter and hybrid retrieval")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100], help="Text policy sizes")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per document")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per query")
+    parser.add_argument("--cold-repeat", type=int, default=3, help="Cold parse + first query runs per mode")
+    parser.add_argument("--max-clauses", type=int, default=20000, help="Override Config.MAX_CLAUSES")
+    parser.add_argument("--data-dir", default="bench_data", help="Where synthetic policies are cached")
+    parser.add_argument("--output", help="Result JSON path (default: bench_results/retrieval-<timestamp>.json)")
+    args = parser.parse_args()
+
+    from insurance_api import config, processor
+    config.MAX_CLAUSES = args.max_clauses
+    # Disable similarity thresholds so every mode returns a full top-k
+    config.SIMILARITY_PRIMARY = config.SIMILARITY_FALLBACK = -1.0
+
+    documents = generate(args.data_dir, args.pages)
+    queries = make_queries(args.queries)
+    latency, quality = {}, {}
+
+    for pages, path in sorted(documents["txt"].items()):
+        dense_top = {}
+        for mode in MODES:
+            config.RETRIEVAL_MODE = mode
+            first_query = queries[0][0]
+
+            def cold():
+                processor.release_document(path)
+                processor.search_clauses(first_query, processor.parse_document(path), path)
+
+            cold_timings = time_call(cold, args.cold_repeat)
+            clauses = processor.parse_document(path)
+            label = f"{mode}[{pages}p, {len(clauses)} clauses]"
+            latency[f"cold {label}"] = summarize(cold_timings)
+            timings, precision, overlap = [], [], []
+            for query, required in queries:
+                timings += time_call(lambda: processor.search_clauses(query, clauses, path, mode=mode), args.repeat)
+                found = [clause[0].lower() for clause, _ in processor.search_clauses(query, clauses, path, mode=mode)]
+
+                relevant = [text for text in found if all(term in text for term in required)]
+                precision.append(len(relevant) / max(len(found), 1))
+                if mode == "dense":
+                    dense_top[query] = set(found)
+                overlap.append(len(dense_top[query] & set(found)) / max(len(dense_top[query]), 1))
+            latency[f"warm {label}"] = summarize(timings)
+            quality[label] = {
+                # Prefiltered documents only embed clauses some query shortlisted
+                "embedded_clauses": getattr(processor.embedding_cache[path], "encoded", len(clauses)),
+                f"precision@{config.TOP_K_CLAUSES}": round(sum(precision) / len(precision), 4),
+                "overlap_with_dense": round(sum(overlap) / len(overlap), 4),
+            }
+
+    print_table(latency)
+    print()
+    for label, scores in quality.items():
+        print(f"{label:<45} " + "  ".join(f"{name} {value:.3f}" if isinstance(value, float) else f"{name} {value}"
+                                          for name, value in scores.items()))
+    save_results("retrieval", {
+        "parameters": vars(args),
+        "embedding_storage": config.EMBEDDING_STORAGE,
+        "results": latency,
+        "quality": quality,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Synthetic policy documents for benchmarking.
+Generates deterministic policy text and writes it as plain text, text-layer
+PDFs or scanned (image-only) PDFs of a given page count.
+
+Usage:
+    python -m benchmarks.synthetic --pages 10 100 1000 --out bench_data
+"""
+
+import argparse
+import io
+import random
+from pathlib import Path
+from typing import Iterable, List
+
+from PIL import Image, ImageDraw
+
+LINES_PER_PAGE = 48
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter in points
+
+PROCEDURES = [
+    "knee surgery", "cataract surgery", "maternity care", "cardiac bypass operation",
+    "dialysis treatment", "appendix removal procedure", "hip replacement surgery",
+    "chemotherapy treatment", "dental treatment", "physiotherapy care",
+]
+CITIES = ["Pune", "Mumbai", "Delhi", "Chennai", "Kolkata", "Bengaluru", "Hyderabad", "Jaipur"]
+
+CLAUSE_TEMPLATES = [
+    "Inpatient hospitalization for {procedure} is covered up to the sum insured.",
+    "Expenses for {procedure} are covered after a {months}-month waiting period.",
+    "{procedure} arising from an accident is covered from the first day of the policy.",
+    "Pre and post hospitalization expenses for {procedure} are reimbursed for {days} days.",
+    "Cosmetic or elective {procedure} is excluded unless medically necessary.",
+    "Claims for {procedure} must be submitted within {days} days of discharge.",
+    "Cashless {procedure} is available at network hospitals in {city}.",
+    "Maternity benefits including childbirth are covered after a {months}-month waiting period.",
+    "Pre-existing conditions are not covered for the first {months} months of the policy.",
+    "Room rent for {procedure} is limited to {pct} percent of the sum insured per day.",
+]
+
+QUERIES = {
+    "en": "46-year-old male, knee surgery in Pune, 3-month-old insurance policy",
+    "hi": "46 वर्षीय पुरुष, पुणे में घुटने की सर्जरी, 3 महीने पुरानी बीमा पॉलिसी",
+    "es": "Hombre de 46 años, cirugía de rodilla en Pune, póliza de seguro de 3 meses",
+    "fr": "Homme de 46 ans, chirurgie du genou à Pune, police d'assurance de 3 mois",
+    "de": "46-jähriger Mann, Knieoperation in Pune, 3 Monate alte Versicherungspolice",
+    "pt": "Homem de 46 anos, cirurgia no joelho em Pune, apólice de seguro de 3 meses",
+    "it": "Uomo di 46 anni, intervento al ginocchio a Pune, polizza assicurativa di 3 mesi",
+    "zh": "46岁男性，在浦那进行膝盖手术，保险单已生效3个月",
+    "ja": "46歳男性、プネーで膝の手術、保険加入から3か月",
+    "ko": "46세 남성, 푸네에서 무릎 수술, 가입 3개월 된 보험",
+    "ar": "رجل يبلغ من العمر 46 عامًا، جراحة الركبة في بونه، وثيقة تأمين عمرها 3 أشهر",
+    "ru": "Мужчина 46 лет, операция на колене в Пуне, страховому полису 3 месяца",
+}
+
+
+def policy_lines(pages: int, seed: int = 0) -> List[str]:
+    """Deterministic policy text laid out as LINES_PER_PAGE lines per page."""
+    rng = random.Random(seed)
+    lines = []
+    section = 0
+    while len(lines) < pages * LINES_PER_PAGE:
+        section += 1
+        lines.append(f"{section}. Section {section} - Benefits and Conditions")
+        for _ in range(rng.randint(3, 8)):
+            clause = rng.choice(CLAUSE_TEMPLATES).format(
+                procedure=rng.choice(PROCEDURES), city=rng.choice(CITIES),
+                months=rng.choice([9, 12, 24, 36, 48]), days=rng.choice([30, 60, 90]),
+                pct=rng.choice([1, 2, 5]),
+            )
+            lines.append(f"   - {clause[0].upper()}{clause[1:]}")
+        lines.append("")
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def paginate(lines: List[str]) -> List[List[str]]:
+    return [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+
+def write_text(path: Path, pages: int, seed: int = 0) -> Path:
+    path.write_text("\n".join(policy_lines(pages, seed)), encoding="utf-8")
+    return path
+
+
+def write_text_pdf(path: Path, pages: int, seed: int = 0) -> Path:
+    """PDF with a real text layer (Helvetica), one content stream per page."""
+    streams = []
+    for page in paginate(policy_lines(pages, seed)):
+        ops = ["BT", "/F1 10 Tf", "14 TL", f"50 {PAGE_HEIGHT - 50} Td"]
+        for line in page:
+            ops.append(f"({_pdf_escape(line)}) '")
+        ops.append("ET")
+        streams.append(("\n".join(ops)).encode("latin-1", errors="replace"))
+    _write_pdf(path, ((stream, None) for stream in streams), len(streams))
+    return path
+
+
+def write_scanned_pdf(path: Path, pages: int, seed: int = 0, dpi: int = 150) -> Path:
+    """Image-only PDF (one JPEG per page) that forces the OCR path."""
+    page_texts = paginate(policy_lines(pages, seed))
+
+    def render():
+        width, height = int(PAGE_WIDTH * dpi / 72), int(PAGE_HEIGHT * dpi / 72)
+        for page in page_texts:
+            image = Image.new("L", (width, height), 255)
+            draw = ImageDraw.Draw(image)
+            y = int(50 * dpi / 72)
+            for line in page:
+                draw.text((int(50 * dpi / 72), y), line, fill=0)
+                y += int(14 * dpi / 72)
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=80)
+            # Draw the image over the full page
+            content = f"q {PAGE_WIDTH} 0 0 {PAGE_HEIGHT} 0 0 cm /Im0 Do Q".encode()
+            yield content, (buffer.getvalue(), width, height)
+
+    _write_pdf(path, render(), len(page_texts))
+    return path
+
+
+def generate(out_dir: str, sizes: Iterable[int], scanned_sizes: Iterable[int] = (), seed: int = 0) -> dict:
+    """Write a text PDF and .txt per size plus scanned PDFs; return paths by kind and size."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    documents = {"txt": {}, "pdf": {}, "scanned": {}}
+    for pages in sizes:
+        documents["txt"][pages] = _cached(out / f"policy_{pages}p.txt", write_text, pages, seed)
+        documents["pdf"][pages] = _cached(out / f"policy_{pages}p.pdf", write_text_pdf, pages, seed)
+    for pages in scanned_sizes:
+        documents["scanned"][pages] = _cached(out / f"policy_{pages}p_scanned.pdf", write_scanned_pdf, pages, seed)
+    return documents
+
+
+def _cached(path: Path, writer, pages: int, seed: int) -> str:
+    if not path.exists():
+        writer(path, pages, seed)
+    return str(path)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _write_pdf(path: Path, pages, page_count: int):
+    """
+    Minimal PDF writer streaming pages to disk.
+
+    ``pages`` yields (content_stream, image) where image is None or
+    (jpeg_bytes, width, height). Object numbers: 1 catalog, 2 page tree,
+    3 font, then three objects per page (page, content, image).
+    """
+    offsets = {}
+    with open(path, "wb") as f:
+        def obj(number: int, body: bytes):
+            offsets[number] = f.tell()
+            f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        def stream(number: int, data: bytes, extra: str = ""):
+            obj(number, f"<< /Length {len(data)}{extra} >>\nstream\n".encode() + data + b"\nendstream")
+
+        f.write(b"%PDF-1.4\n")
+        kids = " ".join(f"{4 + 3 * i} 0 R" for i in range(page_count))
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode())
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+        for i, (content, image) in enumerate(pages):
+            page_no, content_no, image_no = 4 + 3 * i, 5 + 3 * i, 6 + 3 * i
+            xobject = f" /XObject << /Im0 {image_no} 0 R >>" if image else ""
+            obj(page_no, (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >>{xobject} >> /Contents {content_no} 0 R >>"
+            ).encode())
+            stream(content_no, content)
+            if image:
+                data, width, height = image
+                stream(image_no, data, f" /Type /XObject /Subtype /Image /Width {width} /Height {height}"
+                                       " /ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /DCTDecode")
+            else:
+                obj(image_no, b"null")
+
+        xref = f.tell()
+        count = 4 + 3 * page_count
+        f.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode())
+        for number in range(1, count):
+            f.write(f"{offsets[number]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic policy documents")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000], help="Text document sizes")
+    parser.add_argument("--scanned-pages", type=int, nargs="*", default=[10, 100], help="Scanned PDF sizes")
+    parser.add_argument("--out", default="bench_data", help="Output directory")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    documents = generate(args.out, args.pages, args.scanned_pages, args.seed)
+    for kind, paths in documents.items():
+        for pages, path in paths.items():
+            print(f"{kind:>8} {pages:>5} pages: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Offline bulk claim processing for the Insurance Claims Processing System.
+Reads a JSONL of claims, parses and embeds each policy once, spreads the
+work over a process pool (one model set per process) and writes results as
+JSONL. Each policy is one task, so all of its claims run in the same worker;
+re-running with --resume skips claims already in the output file.
+
+Input lines look like:
+    {"id": "claim-1", "query": "46-year-old male, knee surgery in Pune", "document": "policies/p1.pdf"}
+
+Usage:
+    python bulk_process.py claims.jsonl -o results.jsonl --workers 4 --resume
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Tuple
+
+from log_config import sampled_request, setup_logging
+
+_processor = None
+_sample_rate = 1.0
+
+
+def load_claims(path: str) -> List[Dict[str, str]]:
+    """Read claims from JSONL, assigning line-number IDs where none are given."""
+    claims = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            document = record.get("document") or record.get("document_path") or record.get("file")
+            if not record.get("query") or not document:
+                print(f"Skipping line {line_no}: needs 'query' and 'document'", file=sys.stderr)
+                continue
+            claims.append({
+                "id": str(record.get("id") or record.get("request_id") or line_no),
+                "query": record["query"],
+                "document": document,
+            })
+    return claims
+
+
+def completed_ids(output_path: str) -> set:
+    """IDs already written to the output file; a torn final line is ignored."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def group_by_document(claims: List[Dict[str, str]]) -> List[Tuple[str, list]]:
+    """One (document, claims) task per document, largest first so big policies start early."""
+    groups: Dict[str, list] = {}
+    for claim in claims:
+        groups.setdefault(claim["document"], []).append(claim)
+    return sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)
+
+
+def _init_worker(log_level: str, sample_rate: float):
+    """Load one model set per worker process, logging to stderr on one torch thread."""
+    global _processor, _sample_rate
+    # Configured before the API module is imported, so workers never open
+    # (and rotate) the service's log file
+    setup_logging(log_file=None, level=log_level, sample_rate=sample_rate)
+    _sample_rate = sample_rate
+
+    # The pool already uses every core; per-process torch threads would oversubscribe them
+    import torch
+    torch.set_num_threads(1)
+
+    from insurance_api import processor
+    _processor = processor
+
+
+def _process_task(task: Tuple[str, list]) -> Tuple[list, float]:
+    """Parse one document and process all of its claims; returns results and CPU seconds."""
+    document, items = task
+    cpu_start = time.process_time()
+    results = []
+    try:
+        clauses = _processor.parse_document(document)
+        parse_error = None
+    except Exception as e:
+        clauses, parse_error = [], str(e)
+
+    try:
+        for claim in items:
+            start = time.perf_counter()
+            if parse_error:
+                result = {"error": f"Processing failed: {parse_error}"}
+            else:
+                with sampled_request(_sample_rate):
+                    result = _processor.process_query(claim["query"], document, clauses=clauses)
+            results.append({**claim, "result": result, "elapsed_s": round(time.perf_counter() - start, 4)})
+    finally:
+        # The document is not seen again by this worker
+        _processor.release_document(document)
+    return results, time.process_time() - cpu_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process claims in bulk from a JSONL file")
+    parser.add_argument("input", help="JSONL with query and document per line")
+    parser.add_argument("-o", "--output", default="bulk_results.jsonl", help="Output JSONL")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--resume", action="store_true", help="Skip claims already in the output file")
+    parser.add_argument("--log-level", default="WARNING", help="Worker log level (workers log to stderr)")
+    parser.add_argument("--log-sample-rate", type=float, default=0.1,
+                        help="Share of claims whose detail logs are kept")
+    args = parser.parse_args()
+
+    claims = load_claims(args.input)
+    done = completed_ids(args.output) if args.resume else set()
+    pending = [claim for claim in claims if claim["id"] not in done]
+    tasks = group_by_document(pending)
+    print(f"{len(claims)} claims, {len(done)} already done, {len(pending)} pending "
+          f"across {len(tasks)} documents on {args.workers} workers")
+    if not pending:
+        return
+
+    processed = errors = 0
+    cpu_seconds = 0.0
+    start = time.perf_counter()
+    with open(args.output, "a" if args.resume else "w", encoding="utf-8") as out, \
+            Pool(args.workers, initializer=_init_worker, initargs=(args.log_level, args.log_sample_rate)) as pool:
+        for results, cpu in pool.imap_unordered(_process_task, tasks):
+            for record in results:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                errors += "error" in record["result"]
+            # The output file doubles as the resume checkpoint
+            out.flush()
+            os.fsync(out.fileno())
+            processed += len(results)
+            cpu_seconds += cpu
+            print(f"  {processed}/{len(pending)} claims", end="\r", flush=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"\nProcessed {processed} claims ({errors} errors) in {elapsed:.1f}s")
+    print(f"Throughput: {processed / elapsed:.2f} claims/sec, "
+          f"{processed / elapsed / args.workers:.2f} claims/sec per core, "
+          f"{processed / cpu_seconds if cpu_seconds else 0:.2f} claims per CPU-second")
+
+
+if __name__ == "__main__":
+    main()
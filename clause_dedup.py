@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate clause deduplication for the Insurance Claims Processing System.
+Boilerplate clauses recur across policies with small OCR differences; MinHash
+signatures with LSH banding map each of them to one canonical clause whose
+embedding is computed and stored once and shared by every document.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import torch
+
+# Prime just above 2**32 for the universal hash family (a * x + b) mod P
+_HASH_PRIME = np.uint64(4294967311)
+
+
+def normalize_clause(text: str) -> str:
+    """Lowercase alphanumerics with single spaces; OCR punctuation noise is dropped."""
+    return re.sub(r"[^\w]+", " ", text.lower()).strip()
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """Character n-grams of normalised text; tolerant of single-character OCR errors."""
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures with LSH banding over character shingles."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 5, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # a < 2**31 and x < 2**32 keep a * x inside uint64
+        self.a = rng.randint(1, 2 ** 31, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, normalized: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles(normalized, self.shingle_size)),
+            dtype=np.uint64
+        )
+        permuted = (np.outer(hashes, self.a) + self.b) % _HASH_PRIME
+        # Minima of many hashes sit far below 2**32; stored as uint32 to halve the index
+        return np.minimum(permuted.min(axis=0), 2 ** 32 - 1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """32-bit hash per band; the band number seeds the hash so equal rows in different bands differ."""
+        return [
+            zlib.crc32(signature[band * self.rows:(band + 1) * self.rows].tobytes(), band)
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(first == second))
+
+
+class _HashMultiMap:
+    """uint32 -> int32 multimap with open addressing in numpy arrays, kept at most half full."""
+
+    def __init__(self, capacity: int = 64):
+        self.keys = np.zeros(capacity, dtype=np.uint32)
+        self.values = np.full(capacity, -1, dtype=np.int32)
+        self.size = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.values.nbytes
+
+    def add(self, key: int, value: int):
+        if 2 * (self.size + 1) > len(self.keys):
+            self._grow()
+        self._insert(key, value)
+        self.size += 1
+
+    def get(self, key: int) -> List[int]:
+        found = []
+        mask = len(self.keys) - 1
+        slot = key & mask
+        while self.values[slot] >= 0:
+            if self.keys[slot] == key:
+                found.append(int(self.values[slot]))
+            slot = (slot + 1) & mask
+        return found
+
+    def _insert(self, key: int, value: int):
+        mask = len(self.keys) - 1
+        slot = key & mask
+        while self.values[slot] >= 0:
+            slot = (slot + 1) & mask
+        self.keys[slot] = key
+        self.values[slot] = value
+
+    def _grow(self):
+        keys, values = self.keys, self.values
+        self.keys = np.zeros(2 * len(keys), dtype=np.uint32)
+        self.values = np.full(2 * len(keys), -1, dtype=np.int32)
+        for slot in np.flatnonzero(values >= 0):
+            self._insert(int(keys[slot]), int(values[slot]))
+
+
+def _numbers_digest(numbers: tuple) -> int:
+    return int.from_bytes(hashlib.blake2b(" ".join(numbers).encode(), digest_size=8).digest(), "little")
+
+
+class ClauseRegistry:
+    """
+    Canonical clauses and their fp32 embeddings, shared across documents.
+
+    Two clauses are merged when their estimated shingle Jaccard similarity is
+    at least ``threshold`` and they contain the same numbers, so "30-day" and
+    "90-day" variants of a clause keep separate embeddings.
+
+    The index keeps no clause text: per canonical clause it holds a uint32
+    MinHash signature, a 64-bit digest of its numbers and 32-bit hash-table
+    entries for its LSH bands and normalised text. Exact-text hits are
+    confirmed by comparing signatures and numbers.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, bands: int = 16):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, bands)
+        self._exact = _HashMultiMap()
+        self._buckets = _HashMultiMap()
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._numbers = np.empty(0, dtype=np.uint64)
+        self._embeddings: Optional[torch.Tensor] = None
+        self._lock = threading.Lock()
+        self.count = 0
+        self.clauses_seen = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.embeddings_computed = 0
+        self.encode_seconds = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by canonical embeddings and the dedup index (allocated capacity)."""
+        embeddings = 0 if self._embeddings is None else self._embeddings.element_size() * self._embeddings.nelement()
+        return embeddings + self.index_nbytes
+
+    @property
+    def index_nbytes(self) -> int:
+        return self._signatures.nbytes + self._numbers.nbytes + self._exact.nbytes + self._buckets.nbytes
+
+    def embed(self, clause_texts: List[str],
+              encode_fn: Callable[[List[str]], torch.Tensor]) -> "SharedClauseEmbeddings":
+        """
+        Map clauses to canonical ids, encoding only clauses not seen before.
+
+        Encoding runs outside the lock so other documents can look up known
+        clauses meanwhile. New clauses are looked up again before they are
+        inserted; one indexed by another caller in the meantime, or earlier
+        in the same batch, is reused and the extra embedding dropped.
+        """
+        fingerprints = [self._fingerprint(text) for text in clause_texts]
+        with self._lock:
+            found = [self._lookup(fingerprint) for fingerprint in fingerprints]
+        missing = [i for i, (canonical, _) in enumerate(found) if canonical is None]
+
+        embeddings = None
+        if missing:
+            start = time.perf_counter()
+            encoded = encode_fn([clause_texts[i] for i in missing])
+            elapsed = time.perf_counter() - start
+            embeddings = torch.nn.functional.normalize(encoded.detach().float().cpu(), dim=-1)
+
+        with self._lock:
+            for row, i in enumerate(missing):
+                canonical, match = self._lookup(fingerprints[i])
+                if canonical is None:
+                    canonical, match = self._insert(fingerprints[i], embeddings[row]), None
+                found[i] = (canonical, match)
+            if missing:
+                self.encode_seconds += elapsed
+                self.embeddings_computed += len(missing)
+            self.clauses_seen += len(clause_texts)
+            self.exact_duplicates += sum(match == "exact" for _, match in found)
+            self.near_duplicates += sum(match == "near" for _, match in found)
+        ids = [canonical for canonical, _ in found]
+        return SharedClauseEmbeddings(self, torch.tensor(ids, dtype=torch.long))
+
+    def rows(self, ids: torch.Tensor) -> torch.Tensor:
+        return self._embeddings[ids]
+
+    def stats(self) -> Dict[str, float]:
+        """How much deduplication saved in embedding compute and memory, net of the index."""
+        saved = self.clauses_seen - self.embeddings_computed
+        bytes_per_clause = self._embeddings.shape[1] * 4 if self._embeddings is not None else 0
+        seconds_per_clause = self.encode_seconds / self.embeddings_computed if self.embeddings_computed else 0.0
+        index_bytes = self.index_nbytes
+        return {
+            "clauses_seen": self.clauses_seen,
+            "canonical_clauses": self.count,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "dedup_ratio": round((self.clauses_seen - self.count) / self.clauses_seen, 4) if self.clauses_seen else 0.0,
+            "embeddings_computed": self.embeddings_computed,
+            "embeddings_saved": saved,
+            "encode_seconds": round(self.encode_seconds, 3),
+            "encode_seconds_saved_estimate": round(saved * seconds_per_clause, 3),
+            "embedding_bytes": self.count * bytes_per_clause,
+            "index_bytes": index_bytes,
+            "bytes_saved": (self.clauses_seen - self.count) * bytes_per_clause - index_bytes,
+        }
+
+    def _fingerprint(self, text: str) -> tuple:
+        """(normalised text hash, MinHash signature, numbers digest) of a clause."""
+        normalized = normalize_clause(text)
+        return (zlib.crc32(normalized.encode("utf-8")), self.hasher.signature(normalized),
+                _numbers_digest(tuple(re.findall(r"\d+", normalized))))
+
+    def _lookup(self, fingerprint: tuple):
+        """(canonical id, "exact" or "near") of a matching clause, or (None, None)."""
+        text_hash, signature, numbers = fingerprint
+        for candidate in self._exact.get(text_hash):
+            if self._numbers[candidate] == numbers and np.array_equal(self._signatures[candidate], signature):
+                return candidate, "exact"
+
+        candidates = {candidate for key in self._band_keys(signature, numbers) for candidate in self._buckets.get(key)}
+        candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        candidates = candidates[self._numbers[candidates] == numbers]
+        if not len(candidates):
+            return None, None
+        similarities = (self._signatures[candidates] == signature).mean(axis=1)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None, None
+        return int(candidates[best]), "near"
+
+    def _band_keys(self, signature: np.ndarray, numbers: int) -> List[int]:
+        """LSH band keys salted with the numbers digest; clauses with other numbers never share a bucket."""
+        salt = numbers.to_bytes(8, "little")
+        return [zlib.crc32(salt, key) for key in self.hasher.band_keys(signature)]
+
+    def _insert(self, fingerprint: tuple, embedding: torch.Tensor) -> int:
+        text_hash, signature, numbers = fingerprint
+        canonical = self.count
+        self._reserve(canonical + 1, len(embedding))
+        self._signatures[canonical] = signature
+        self._numbers[canonical] = numbers
+        self._embeddings[canonical] = embedding
+        self._exact.add(text_hash, canonical)
+        for key in self._band_keys(signature, numbers):
+            self._buckets.add(key, canonical)
+        self.count = canonical + 1
+        return canonical
+
+    def _reserve(self, needed: int, dim: int):
+        if self._embeddings is None:
+            self._embeddings = torch.empty((max(needed, 1024), dim))
+        elif needed > len(self._embeddings):
+            # Grow geometrically so appends stay amortised O(1)
+            grown = torch.empty((max(needed, 2 * len(self._embeddings)), dim))
+            grown[:self.count] = self._embeddings[:self.count]
+            self._embeddings = grown
+        if needed > len(self._signatures):
+            capacity = max(needed, 64, 2 * len(self._signatures))
+            signatures = np.empty((capacity, self._signatures.shape[1]), dtype=np.uint32)
+            signatures[:self.count] = self._signatures[:self.count]
+            numbers = np.empty(capacity, dtype=np.uint64)
+            numbers[:self.count] = self._numbers[:self.count]
+            self._signatures, self._numbers = signatures, numbers
+
+
+class SharedClauseEmbeddings:
+    """One document's clauses as references into a ClauseRegistry; searched like ClauseEmbeddings."""
+
+    storage = "shared"
+    needs_rerank = False
+
+    def __init__(self, registry: ClauseRegistry, ids: torch.Tensor):
+        self.registry = registry
+        self.ids = ids
+        self.count = len(ids)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by this document's references; embeddings live in the registry."""
+        return self.ids.element_size() * self.ids.nelement()
+
+    def decode(self, candidates: Optional[torch.Tensor] = None) -> torch.Tensor:
+        ids = self.ids if candidates is None else self.ids[candidates]
+        return self.registry.rows(ids)
+
+    def scores(self, query_embedding: torch.Tensor,
+               candidates: Optional[torch.Tensor] = None) -> torch.Tensor:
+        query = torch.nn.functional.normalize(query_embedding.detach().float().cpu().reshape(-1), dim=0)
+        return self.decode(candidates) @ query
+
+    def search(self, query_embedding: torch.Tensor, top_k: int, rerank_fn=None,
+               rerank_factor: int = 4, candidates: Optional[torch.Tensor] = None):
+        """Return (scores, indices) of the top_k clauses; embeddings are exact fp32."""
+        scores = self.scores(query_embedding, candidates)
+        index_map = candidates if candidates is not None else torch.arange(self.count)
+        order = torch.argsort(scores, descending=True)[:min(top_k, len(index_map))]
+        return scores[order], index_map[order]
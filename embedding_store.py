@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Clause embedding storage for the Insurance Claims Processing System.
+Holds per-document clause embeddings in fp32, fp16, int8, binary or
+product-quantised form and scores queries against them.
+"""
+
+import torch
+from typing import Callable, Dict, Optional
+
+STORAGE_MODES = ("fp32", "fp16", "int8", "binary", "pq")
+
+# Modes whose scores are too coarse to rank on directly; their top candidates
+# are re-scored against exact fp32 embeddings.
+RERANKED_MODES = ("binary", "pq")
+
+
+class ClauseEmbeddings:
+    """Clause embeddings for one document in a configurable storage format."""
+
+    def __init__(self, embeddings: torch.Tensor, storage: str = "fp32",
+                 pq_subvectors: int = 48, pq_iterations: int = 10):
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unsupported embedding storage: {storage}")
+
+        embeddings = torch.nn.functional.normalize(embeddings.detach().float().cpu(), dim=-1)
+        self.storage = storage
+        self.count, self.dim = embeddings.shape
+
+        if storage == "fp32":
+            self.data = embeddings
+        elif storage == "fp16":
+            self.data = embeddings.half()
+        elif storage == "int8":
+            self.scales = embeddings.abs().amax(dim=1, keepdim=True).clamp(min=1e-8) / 127.0
+            self.data = torch.round(embeddings / self.scales).to(torch.int8)
+        elif storage == "binary":
+            self.data = self._pack_bits(embeddings > 0)
+        elif storage == "pq":
+            self._train_pq(embeddings, pq_subvectors, pq_iterations)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the stored representation."""
+        if self.storage == "int8":
+            return _tensor_bytes(self.data) + _tensor_bytes(self.scales)
+        if self.storage == "pq":
+            return _tensor_bytes(self.codes) + _tensor_bytes(self.codebooks)
+        return _tensor_bytes(self.data)
+
+    @property
+    def needs_rerank(self) -> bool:
+        return self.storage in RERANKED_MODES
+
+    def scores(self, query_embedding: torch.Tensor,
+               candidates: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """Approximate cosine similarity of the query against stored clauses."""
+        query = torch.nn.functional.normalize(query_embedding.detach().float().cpu().reshape(-1), dim=0)
+
+        if self.storage == "pq":
+            codes = self.codes if candidates is None else self.codes[candidates]
+            sub_queries = query.reshape(self.pq_subvectors, -1)
+            # (subvectors, centroids) table of partial inner products
+            table = torch.einsum('sd,scd->sc', sub_queries, self.codebooks)
+            return table.gather(1, codes.t().long()).sum(dim=0)
+
+        vectors = self.decode(candidates)
+        return vectors @ query
+
+    def decode(self, candidates: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """Reconstruct fp32 vectors from the stored representation."""
+        if self.storage == "pq":
+            codes = self.codes if candidates is None else self.codes[candidates]
+            parts = [self.codebooks[s][codes[:, s].long()] for s in range(self.pq_subvectors)]
+            return torch.cat(parts, dim=1)
+
+        data = self.data if candidates is None else self.data[candidates]
+        if self.storage == "fp32":
+            return data
+        if self.storage == "fp16":
+            return data.float()
+        if self.storage == "int8":
+            scales = self.scales if candidates is None else self.scales[candidates]
+            return data.float() * scales
+        # binary: +-1 per dimension, scaled to unit length
+        bits = self._unpack_bits(data)
+        return (bits.float() * 2 - 1) / (self.dim ** 0.5)
+
+    def search(self, query_embedding: torch.Tensor, top_k: int,
+               rerank_fn: Optional[Callable[[list], torch.Tensor]] = None,
+               rerank_factor: int = 4,
+               candidates: Optional[torch.Tensor] = None):
+        """
+        Return (scores, indices) of the top_k clauses.
+
+        For binary and PQ storage the best ``top_k * rerank_factor`` candidates
+        are re-scored with exact fp32 embeddings from ``rerank_fn``, which maps
+        a list of clause indices to their fp32 embeddings.
+        """
+        scores = self.scores(query_embedding, candidates)
+        index_map = candidates if candidates is not None else torch.arange(self.count)
+        top_k = min(top_k, len(index_map))
+
+        if self.needs_rerank and rerank_fn is not None:
+            shortlist = torch.argsort(scores, descending=True)[:top_k * max(rerank_factor, 1)]
+            shortlist_ids = index_map[shortlist]
+            exact = torch.nn.functional.normalize(rerank_fn(shortlist_ids.tolist()).float().cpu(), dim=-1)
+            query = torch.nn.functional.normalize(query_embedding.detach().float().cpu().reshape(-1), dim=0)
+            exact_scores = exact @ query
+            order = torch.argsort(exact_scores, descending=True)[:top_k]
+            return exact_scores[order], shortlist_ids[order]
+
+        order = torch.argsort(scores, descending=True)[:top_k]
+        return scores[order], index_map[order]
+
+    def _train_pq(self, embeddings: torch.Tensor, subvectors: int, iterations: int):
+        """Train per-subspace k-means codebooks and encode the clauses."""
+        while self.dim % subvectors:
+            subvectors -= 1
+        self.pq_subvectors = subvectors
+        centroids = min(256, self.count)
+        sub_dim = self.dim // subvectors
+        parts = embeddings.reshape(self.count, subvectors, sub_dim).transpose(0, 1)
+
+        generator = torch.Generator().manual_seed(0)
+        codebooks = torch.empty(subvectors, centroids, sub_dim)
+        codes = torch.empty(self.count, subvectors, dtype=torch.uint8)
+        for s in range(subvectors):
+            points = parts[s]
+            centers = points[torch.randperm(self.count, generator=generator)[:centroids]].clone()
+            for _ in range(iterations):
+                assignment = torch.cdist(points, centers).argmin(dim=1)
+                sums = torch.zeros_like(centers).index_add_(0, assignment, points)
+                counts = torch.bincount(assignment, minlength=centroids)
+                filled = counts > 0
+                centers[filled] = sums[filled] / counts[filled].unsqueeze(1)
+            codebooks[s] = centers
+            codes[:, s] = torch.cdist(points, centers).argmin(dim=1).to(torch.uint8)
+
+        self.codebooks = codebooks
+        self.codes = codes
+
+    @staticmethod
+    def _pack_bits(bits: torch.Tensor) -> torch.Tensor:
+        bits = bits.to(torch.uint8)
+        pad = (-bits.shape[1]) % 8
+        if pad:
+            bits = torch.nn.functional.pad(bits, (0, pad))
+        weights = torch.tensor([128, 64, 32, 16, 8, 4, 2, 1], dtype=torch.uint8)
+        grouped = bits.reshape(bits.shape[0], -1, 8)
+        return (grouped * weights).sum(dim=2).to(torch.uint8)
+
+    def _unpack_bits(self, packed: torch.Tensor) -> torch.Tensor:
+        weights = torch.tensor([128, 64, 32, 16, 8, 4, 2, 1], dtype=torch.uint8)
+        bits = (packed.unsqueeze(-1) & weights) > 0
+        return bits.reshape(packed.shape[0], -1)[:, :self.dim]
+
+
+class LazyClauseEmbeddings:
+    """
+    fp32 clause embeddings for one document, encoded only for the clauses a
+    search asks for. Used with the BM25 prefilter so a large document never
+    pays for embedding clauses that no query shortlists.
+    """
+
+    storage = "fp32"
+    needs_rerank = False
+
+    def __init__(self, count: int, encode_fn: Callable[[list], torch.Tensor]):
+        self.count = count
+        self.encode_fn = encode_fn
+        self.rows: Dict[int, torch.Tensor] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def encoded(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(_tensor_bytes(row) for row in list(self.rows.values()))
+
+    def decode(self, candidates: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """fp32 vectors for the candidates, encoding any not seen before."""
+        ids = list(range(self.count)) if candidates is None else candidates.tolist()
+        missing = [i for i in dict.fromkeys(ids) if i not in self.rows]
+        if missing:
+            encoded = torch.nn.functional.normalize(self.encode_fn(missing).detach().float().cpu(), dim=-1)
+            self.rows.update(zip(missing, encoded))
+        return torch.stack([self.rows[i] for i in ids])
+
+    def scores(self, query_embedding: torch.Tensor,
+               candidates: Optional[torch.Tensor] = None) -> torch.Tensor:
+        query = torch.nn.functional.normalize(query_embedding.detach().float().cpu().reshape(-1), dim=0)
+        return self.decode(candidates) @ query
+
+    def search(self, query_embedding: torch.Tensor, top_k: int,
+               rerank_fn: Optional[Callable[[list], torch.Tensor]] = None,
+               rerank_factor: int = 4,
+               candidates: Optional[torch.Tensor] = None):
+        """Return (scores, indices) of the top_k candidates; rows are exact, so nothing is re-ranked."""
+        scores = self.scores(query_embedding, candidates)
+        index_map = candidates if candidates is not None else torch.arange(self.count)
+        order = torch.argsort(scores, descending=True)[:min(top_k, len(index_map))]
+        return scores[order], index_map[order]
+
+
+def _tensor_bytes(tensor: torch.Tensor) -> int:
+    return tensor.element_size() * tensor.nelement()
@@ -8,27 +8,43 @@ import re
 import json
 import nltk
 import os
-import pdfplumber
 from docx import Document
 from email import parser, policy
 import torch
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
 from transformers import pipeline, AutoModelForSeq2SeqLM, AutoTokenizer
-from pdf2image import convert_from_path
-import pytesseract
 import logging
-from langdetect import detect, DetectorFactory
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import JSONResponse
+from langdetect import DetectorFactory
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Header, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 from datetime import datetime
 from pathlib import Path
 import tempfile
 import shutil
 from typing import Optional, Dict, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+import threading
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from PIL import Image
+from embedding_store import ClauseEmbeddings, LazyClauseEmbeddings
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from clause_dedup import ClauseRegistry, SharedClauseEmbeddings
+from adaptive_ocr import AdaptiveOCR
+from jobs import JobManager, JobQueueFull, report_progress, stream_events
+from memory_governor import MemoryBudgetExceeded, MemoryGovernor, detect_memory_limit, estimate_document_bytes
+from metrics import (
+    registry, span, collect_timings, record_cache,
+    MODEL_LOAD_SECONDS, INFLIGHT_REQUESTS, REQUESTS_TOTAL, CACHE_REQUESTS
+)
+from profiling import RequestProfiler
+from log_config import sampled_request, setup_logging
+from language_detection import LanguageDetector
+from result_cache import ResultCache, document_hash, fingerprint, make_key
+import time
 
 # Ensure consistent language detection
 DetectorFactory.seed = 0
@@ -43,6 +59,7 @@ class Config:
     
     # Language settings
     SUPPORTED_LANGUAGES: Dict[str, str] = None
+    LANGUAGE_CACHE_SIZE: int = 4096
     
     # Business rules
     DEFAULT_COVERAGE: int = 500000
@@ -56,9 +73,73 @@ class Config:
     TOP_K_CLAUSES: int = 3
     
     # OCR settings
-    PDF_DPI: int = 200
+    # Pages are rendered and OCR'd at OCR_LOW_DPI, and rendered again at
+    # OCR_HIGH_DPI only when mean word confidence is below OCR_MIN_CONFIDENCE.
+    # Pages with less than OCR_BLANK_INK_RATIO ink at OCR_LOW_DPI are skipped
+    # as blank.
+    OCR_HIGH_DPI: int = 300
+    OCR_LOW_DPI: int = 150
+    OCR_MIN_CONFIDENCE: float = 75.0
+    OCR_BLANK_INK_RATIO: float = 0.0005
     EMBEDDING_BATCH_SIZE: int = 32
     
+    # Retrieval: dense, prefilter (BM25 candidates, then dense; only candidates are embedded) or hybrid (rank fusion)
+    RETRIEVAL_MODE: str = "dense"
+    BM25_PREFILTER_MIN_CLAUSES: int = 500
+    BM25_PREFILTER_CANDIDATES: int = 100
+    HYBRID_CANDIDATES: int = 50
+    
+    # Embedding storage: fp32, fp16, int8, binary or pq
+    EMBEDDING_STORAGE: str = "fp32"
+    EMBEDDING_RERANK_FACTOR: int = 4
+    PQ_SUBVECTORS: int = 48
+    
+    # Near-duplicate clauses across documents share one fp32 embedding
+    # (EMBEDDING_STORAGE is not used while enabled)
+    CLAUSE_DEDUP: bool = False
+    DEDUP_THRESHOLD: float = 0.85
+    MINHASH_PERMUTATIONS: int = 64
+    MINHASH_BANDS: int = 16
+    
+    # End-to-end result cache
+    RESULT_CACHE_SIZE: int = 1024
+    RESULT_CACHE_TTL: int = 3600
+    
+    # Background jobs: claims submitted to /jobs run on JOB_WORKERS threads;
+    # finished jobs are kept for JOB_RETENTION_SECONDS
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_SIZE: int = 32
+    JOB_RETENTION_SECONDS: int = 900
+    JOB_MAX_RETAINED: int = 1000
+    
+    # Memory: RSS budget in MiB (0 = MEMORY_BUDGET_FRACTION of the container or
+    # machine limit). Over budget, caches are evicted in MEMORY_EVICTION_ORDER,
+    # then new documents wait up to MEMORY_QUEUE_TIMEOUT seconds and are rejected
+    MEMORY_BUDGET_MB: int = 0
+    MEMORY_BUDGET_FRACTION: float = 0.8
+    MEMORY_QUEUE_TIMEOUT: float = 30.0
+    MEMORY_EVICTION_ORDER: tuple = (
+        "lexical_cache", "embedding_cache", "result_cache", "clause_registry", "translation_models"
+    )
+    # Uploads are read into memory before admission (and held while a job is
+    # queued), so larger files are rejected with 413 while being read
+    MAX_UPLOAD_MB: int = 10
+    
+    # Profiling: fraction of requests profiled, plus X-Profile / ?profile=1
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 200
+    
+    # Logging: rotates by size unless LOG_ROTATE_WHEN is set (e.g. "midnight")
+    LOG_FILE: str = "insurance_claims.log"
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    LOG_ROTATE_WHEN: Optional[str] = None
+    LOG_SAMPLE_RATE: float = 0.1
+    LOG_QUEUE_SIZE: int = 10000
+    
     # Server settings
     HOST: str = "0.0.0.0"
     PORT: int = 8000
@@ -76,16 +157,26 @@ class Config:
 config = Config()
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('insurance_claims.log'),
-        logging.StreamHandler()
-    ]
+log_handler = setup_logging(
+    log_file=config.LOG_FILE,
+    level=config.LOG_LEVEL,
+    max_bytes=config.LOG_MAX_BYTES,
+    backup_count=config.LOG_BACKUP_COUNT,
+    rotate_when=config.LOG_ROTATE_WHEN,
+    json_format=config.LOG_JSON,
+    sample_rate=config.LOG_SAMPLE_RATE,
+    queue_size=config.LOG_QUEUE_SIZE
 )
 logger = logging.getLogger(__name__)
 
+# Per-request detail logs are kept for LOG_SAMPLE_RATE of requests
+SAMPLED = {"sample": True}
+
+# Target languages the current request fell back to untranslated text for
+_translation_fallbacks: ContextVar[Optional[set]] = ContextVar("translation_fallbacks", default=None)
+registry.gauge("claims_log_records_dropped", "Log records dropped because the log queue was full",
+               callback=lambda: log_handler.dropped)
+
 class InsuranceClaimsProcessor:
     """Main class for processing insurance claims."""
     
@@ -94,6 +185,18 @@ class InsuranceClaimsProcessor:
         self.llm = None
         self.translation_models = {}
         self.embedding_cache = {}
+        self.lexical_cache = {}
+        self.clause_registry = ClauseRegistry(
+            config.DEDUP_THRESHOLD, config.MINHASH_PERMUTATIONS, config.MINHASH_BANDS
+        )
+        self._translator_lock = threading.Lock()
+        self.ocr = AdaptiveOCR(
+            low_dpi=config.OCR_LOW_DPI,
+            high_dpi=config.OCR_HIGH_DPI,
+            min_confidence=config.OCR_MIN_CONFIDENCE,
+            blank_ink_ratio=config.OCR_BLANK_INK_RATIO
+        )
+        self.language_detector = LanguageDetector(config.SUPPORTED_LANGUAGES, config.LANGUAGE_CACHE_SIZE)
         self._initialize_models()
     
     def _initialize_models(self):
@@ -108,16 +211,20 @@ class InsuranceClaimsProcessor:
             
             # Initialize embedder
             logger.info("Loading sentence transformer model...")
+            start = time.perf_counter()
             self.embedder = SentenceTransformer(config.EMBEDDER_MODEL, device='cpu')
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - start, model=config.EMBEDDER_MODEL)
             
             # Initialize LLM
             logger.info("Loading language model...")
+            start = time.perf_counter()
             self.llm = pipeline(
                 "text2text-generation", 
                 model=config.LLM_MODEL, 
                 max_length=200, 
                 device=-1  # Use CPU
             )
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - start, model=config.LLM_MODEL)
             
             logger.info("Models initialized successfully!")
             
@@ -126,55 +233,49 @@ class InsuranceClaimsProcessor:
             raise
     
     def detect_language(self, text: str) -> str:
-        """Detect language of text with fallback options."""
-        try:
-            if not text or len(text.strip()) < 3:
-                return 'en'
-            
-            # Clean and limit text for detection
-            text = re.sub(r'[^\w\s]', ' ', text)
-            text = text.replace('\n', ' ')[:1000]
-            
-            detected_lang = detect(text)
-            
-            # Map some common variations
-            lang_mapping = {
-                'zh-cn': 'zh', 'zh-tw': 'zh'
-            }
-            detected_lang = lang_mapping.get(detected_lang, detected_lang)
-            
-            return detected_lang if detected_lang in config.SUPPORTED_LANGUAGES else 'en'
-            
-        except Exception as e:
-            logger.warning(f"Language detection failed: {e}, defaulting to English.")
-            return 'en'
+        """Detect language of text: script ranges, stopwords, then langdetect (memoised)."""
+        return self.language_detector.detect(text)
     
     def get_translator(self, target_lang: str):
         """Load or reuse translation model for target language."""
         if target_lang not in config.SUPPORTED_LANGUAGES or target_lang == 'en':
             return None
         
-        if target_lang not in self.translation_models:
-            try:
-                model_name = f"Helsinki-NLP/opus-mt-en-{target_lang}"
-                logger.info(f"Loading translation model for {target_lang}...")
-                
-                tokenizer = AutoTokenizer.from_pretrained(model_name)
-                model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-                self.translation_models[target_lang] = pipeline(
-                    "translation", 
-                    model=model, 
-                    tokenizer=tokenizer, 
-                    device=-1
-                )
-                
-                logger.info(f"Translation model for {target_lang} loaded successfully!")
-                
-            except Exception as e:
-                logger.error(f"Failed to load translation model for {target_lang}: {e}")
-                return None
+        # Keep our own reference: eviction may unload the model while we use it
+        translator = self.translation_models.get(target_lang)
+        record_cache("translation_model", translator is not None)
+        if translator is None:
+            with self._translator_lock:
+                translator = self.translation_models.get(target_lang)
+                if translator is None:
+                    translator = self._load_translator(target_lang)
         
-        return self.translation_models[target_lang]
+        return translator
+    
+    def _load_translator(self, target_lang: str):
+        """Load the translation pipeline for a target language; None if it cannot be loaded."""
+        try:
+            model_name = f"Helsinki-NLP/opus-mt-en-{target_lang}"
+            logger.info(f"Loading translation model for {target_lang}...")
+            start = time.perf_counter()
+            
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+            translator = pipeline(
+                "translation", 
+                model=model, 
+                tokenizer=tokenizer, 
+                device=-1
+            )
+            self.translation_models[target_lang] = translator
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - start, model=model_name)
+            
+            logger.info(f"Translation model for {target_lang} loaded successfully!")
+            return translator
+            
+        except Exception as e:
+            logger.error(f"Failed to load translation model for {target_lang}: {e}")
+            return None
     
     def translate_text(self, text: str, target_lang: str, source_lang: str = 'en') -> str:
         """Translate text to target language."""
@@ -184,69 +285,37 @@ class InsuranceClaimsProcessor:
         translator = self.get_translator(target_lang)
         if translator:
             try:
-                # Handle long texts by splitting them
-                if len(text) > 500:
-                    sentences = text.split('. ')
-                    translated_parts = []
-                    for sentence in sentences:
-                        if sentence.strip():
-                            result = translator(sentence.strip())[0]['translation_text']
-                            translated_parts.append(result)
-                    return '. '.join(translated_parts)
-                else:
-                    return translator(text)[0]['translation_text']
+                with span("translation"):
+                    # Handle long texts by splitting them
+                    if len(text) > 500:
+                        sentences = text.split('. ')
+                        translated_parts = []
+                        for sentence in sentences:
+                            if sentence.strip():
+                                result = translator(sentence.strip())[0]['translation_text']
+                                translated_parts.append(result)
+                        return '. '.join(translated_parts)
+                    else:
+                        return translator(text)[0]['translation_text']
                     
             except Exception as e:
                 logger.error(f"Translation failed for '{text[:50]}...' to {target_lang}: {e}")
         
+        if target_lang in config.SUPPORTED_LANGUAGES:
+            fallbacks = _translation_fallbacks.get()
+            if fallbacks is not None:
+                fallbacks.add(target_lang)
         return text
     
     def extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF using pdfplumber with OCR fallback."""
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for page_num, page in enumerate(pdf.pages, 1):
-                    try:
-                        page_text = page.extract_text(layout=True) or ""
-                        if not page_text.strip():
-                            logger.info(f"Performing OCR on page {page_num} of {file_path}")
-                            image = page.to_image(resolution=config.PDF_DPI).original
-                            page_text = pytesseract.image_to_string(image, lang='eng')
-                        text += page_text + "\n"
-                    except Exception as e:
-                        logger.warning(f"Error processing page {page_num}: {e}")
-                        continue
-                
-                return text.strip()
-                
-        except Exception as e:
-            logger.warning(f"pdfplumber failed for {file_path}: {e}. Attempting full OCR.")
-            return self.extract_text_from_image(file_path)
+        """Extract text from PDF using the text layer with adaptive OCR fallback."""
+        text, _ = self.ocr.extract_pdf(file_path)
+        return text
     
     def extract_text_from_image(self, pdf_path: str) -> str:
         """Extract text from scanned PDFs using OCR."""
-        try:
-            images = convert_from_path(pdf_path, dpi=config.PDF_DPI)
-            text = ""
-            for i, image in enumerate(images):
-                try:
-                    # Optimize image for OCR
-                    if image.mode != 'RGB':
-                        image = image.convert('RGB')
-                    
-                    page_text = pytesseract.image_to_string(image, lang='eng')
-                    text += page_text + "\n"
-                    
-                except Exception as e:
-                    logger.warning(f"OCR failed for page {i+1}: {e}")
-                    continue
-            
-            return text.strip()
-            
-        except Exception as e:
-            logger.error(f"OCR extraction failed for {pdf_path}: {e}")
-            return ""
+        text, _ = self.ocr.extract_scanned(pdf_path)
+        return text
     
     def extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from Word document."""
@@ -339,13 +408,16 @@ class InsuranceClaimsProcessor:
     
     def parse_document(self, file_path: str) -> list:
         """Parse document into clauses with metadata."""
-        text = self.clean_text(self.extract_text(file_path))
+        with span("extract_text"):
+            raw_text = self.extract_text(file_path)
+        with span("clean_text"):
+            text = self.clean_text(raw_text)
         
         if not text:
             logger.warning(f"No text extracted from {file_path}")
             return []
         
-        logger.info(f"Extracted {len(text)} characters from document")
+        logger.info(f"Extracted {len(text)} characters from document", extra=SAMPLED)
         
         # Split into sections
         sections = re.split(r'\n\s*(\d+\.\s+|[A-Z]\.\s+|[ivxlc]+\.\s+)', text, flags=re.IGNORECASE)
@@ -379,25 +451,53 @@ class InsuranceClaimsProcessor:
             if current_clause:
                 self._add_clause(current_clause, clauses, seen_clauses, file_path)
         
-        logger.info(f"Extracted {len(clauses)} clauses from document")
+        logger.info(f"Extracted {len(clauses)} clauses from document", extra=SAMPLED)
+        report_progress("clauses_extracted", clauses=len(clauses))
         
-        # Generate embeddings
-        if clauses and file_path not in self.embedding_cache:
+        # Generate embeddings; prefiltered documents embed only what BM25 shortlists, at search time
+        if clauses:
+            record_cache("embedding", file_path in self.embedding_cache)
+        if clauses and file_path not in self.embedding_cache and not self._prefiltered(clauses):
             clause_texts = [clause[0] for clause in clauses]
             try:
-                embeddings = self.embedder.encode(
-                    clause_texts, 
-                    convert_to_tensor=True, 
-                    batch_size=config.EMBEDDING_BATCH_SIZE,
-                    device='cpu'
-                )
-                self.embedding_cache[file_path] = embeddings
-                logger.info("Generated embeddings for clauses")
+                self.embedding_cache[file_path] = self._embed_clauses(clause_texts)
+                logger.info("Generated embeddings for clauses", extra=SAMPLED)
+                report_progress("clauses_embedded", clauses=len(clause_texts))
             except Exception as e:
                 logger.error(f"Error generating embeddings: {e}")
         
+        # Build the BM25 index next to the embeddings
+        if clauses and config.RETRIEVAL_MODE != "dense" and file_path not in self.lexical_cache:
+            with span("lexical_index"):
+                self.lexical_cache[file_path] = BM25Index([clause[0] for clause in clauses])
+        
         return clauses
     
+    def _prefiltered(self, clauses: list, mode: Optional[str] = None) -> bool:
+        """Whether searches of this document shortlist clauses with BM25 before dense scoring."""
+        return (mode or config.RETRIEVAL_MODE) == "prefilter" and len(clauses) >= config.BM25_PREFILTER_MIN_CLAUSES
+    
+    def _encode_clauses(self, clause_texts: list) -> torch.Tensor:
+        """Encode clause texts to fp32 embeddings."""
+        with span("embedding"):
+            return self.embedder.encode(
+                clause_texts, 
+                convert_to_tensor=True, 
+                batch_size=config.EMBEDDING_BATCH_SIZE,
+                device='cpu'
+            )
+    
+    def _embed_clauses(self, clause_texts: list) -> ClauseEmbeddings:
+        """Encode clause texts into the configured embedding storage."""
+        if config.CLAUSE_DEDUP:
+            with span("clause_dedup"):
+                return self.clause_registry.embed(clause_texts, self._encode_clauses)
+        return ClauseEmbeddings(
+            self._encode_clauses(clause_texts),
+            storage=config.EMBEDDING_STORAGE,
+            pq_subvectors=config.PQ_SUBVECTORS
+        )
+    
     def _add_clause(self, clause_text: str, clauses: list, seen_clauses: set, file_path: str):
         """Add clause if it meets criteria."""
         clause_text = clause_text.strip()
@@ -453,14 +553,15 @@ class InsuranceClaimsProcessor:
         # Fallback to LLM if needed
         if not all(extracted.values()):
             try:
-                llm_result = self._extract_with_llm(english_query)
+                with span("llm_extraction"):
+                    llm_result = self._extract_with_llm(english_query)
                 for key, value in llm_result.items():
                     if not extracted[key] and value:
                         extracted[key] = str(value)
             except Exception as e:
                 logger.warning(f"LLM extraction failed: {e}")
         
-        logger.info(f"Extracted query details: {extracted}")
+        logger.info(f"Extracted query details: {extracted}", extra=SAMPLED)
         return extracted
     
     def _extract_with_llm(self, query: str) -> Dict[str, Any]:
@@ -485,55 +586,145 @@ class InsuranceClaimsProcessor:
             logger.error(f"LLM parsing error: {e}")
             return {}
     
-    def search_clauses(self, query: str, clauses: list, file_path: str) -> list:
-        """Find relevant clauses using semantic search."""
+    def search_clauses(self, query: str, clauses: list, file_path: str, mode: Optional[str] = None) -> list:
+        """Find relevant clauses using semantic search, optionally with BM25 (see RETRIEVAL_MODE)."""
         if not clauses:
             return []
+        mode = mode or config.RETRIEVAL_MODE
         
         try:
-            query_embedding = self.embedder.encode(query, convert_to_tensor=True, device='cpu')
+            with span("query_embedding"):
+                query_embedding = self.embedder.encode(query, convert_to_tensor=True, device='cpu')
             
-            # Get or generate clause embeddings
-            if file_path in self.embedding_cache:
-                clause_embeddings = self.embedding_cache[file_path]
-            else:
-                clause_texts = [clause[0] for clause in clauses]
-                clause_embeddings = self.embedder.encode(
-                    clause_texts, 
-                    convert_to_tensor=True, 
-                    batch_size=config.EMBEDDING_BATCH_SIZE,
-                    device='cpu'
-                )
-                self.embedding_cache[file_path] = clause_embeddings
+            lexical = None
+            if mode != "dense":
+                lexical = self.lexical_cache.get(file_path)
+                if lexical is None:
+                    lexical = BM25Index([clause[0] for clause in clauses])
+                    self.lexical_cache[file_path] = lexical
+            
+            encode_ids = lambda ids: self._encode_clauses([clauses[i][0] for i in ids])
+            candidates = None
+            if self._prefiltered(clauses, mode):
+                with span("lexical_search"):
+                    lexical_top = lexical.top(query, config.BM25_PREFILTER_CANDIDATES)
+                # Without enough term overlap, fall back to scoring every clause
+                if len(lexical_top) >= config.TOP_K_CLAUSES:
+                    candidates = torch.tensor(lexical_top)
             
-            # Calculate similarities
-            similarities = util.cos_sim(query_embedding, clause_embeddings)[0]
+            # Get or generate clause embeddings (the memory governor may have evicted them).
+            # A BM25 shortlist only needs its own clauses embedded; scoring every clause
+            # needs the full store.
+            clause_embeddings = self.embedding_cache.get(file_path)
+            if clause_embeddings is None and candidates is not None:
+                clause_embeddings = LazyClauseEmbeddings(len(clauses), encode_ids)
+                self.embedding_cache[file_path] = clause_embeddings
+            elif clause_embeddings is None or (candidates is None and isinstance(clause_embeddings, LazyClauseEmbeddings)):
+                clause_embeddings = self._embed_clauses([clause[0] for clause in clauses])
+                self.embedding_cache[file_path] = clause_embeddings
             
-            # Get top results
-            top_k = min(config.TOP_K_CLAUSES, len(clauses))
-            top_indices = torch.argsort(similarities, descending=True)[:top_k]
+            # Score clauses; coarse storage modes re-rank candidates in fp32
+            with span("search"):
+                top_k = config.HYBRID_CANDIDATES if mode == "hybrid" else config.TOP_K_CLAUSES
+                scores, top_indices = clause_embeddings.search(
+                    query_embedding,
+                    top_k,
+                    rerank_fn=encode_ids,
+                    # Hybrid already shortlists HYBRID_CANDIDATES; re-rank just those
+                    rerank_factor=1 if mode == "hybrid" else config.EMBEDDING_RERANK_FACTOR,
+                    candidates=candidates
+                )
+                top_results = list(zip(top_indices.tolist(), scores.tolist()))
+                
+                if mode == "hybrid":
+                    top_results = self._fuse_rankings(
+                        query, query_embedding, top_results, lexical, clause_embeddings
+                    )
             
             # Filter by similarity thresholds
             results = [
-                (clauses[i], similarities[i].item()) 
-                for i in top_indices 
-                if similarities[i] > config.SIMILARITY_PRIMARY
+                (clauses[i], score) 
+                for i, score in top_results 
+                if score > config.SIMILARITY_PRIMARY
             ]
             
             if not results:
                 results = [
-                    (clauses[i], similarities[i].item()) 
-                    for i in top_indices 
-                    if similarities[i] > config.SIMILARITY_FALLBACK
+                    (clauses[i], score) 
+                    for i, score in top_results 
+                    if score > config.SIMILARITY_FALLBACK
                 ]
             
-            logger.info(f"Found {len(results)} relevant clauses")
+            logger.info(f"Found {len(results)} relevant clauses", extra=SAMPLED)
             return results
             
         except Exception as e:
             logger.error(f"Error in clause search: {e}")
             return []
     
+    def release_document(self, file_path: str):
+        """Drop per-document caches for a file that will not be processed again."""
+        self.embedding_cache.pop(file_path, None)
+        self.lexical_cache.pop(file_path, None)
+    
+    def memory_components(self) -> Dict[str, tuple]:
+        """(size, evict) functions per cache and model set, for the memory governor."""
+        return {
+            "lexical_cache": (lambda: _cache_bytes(self.lexical_cache),
+                              lambda nbytes: _evict_oldest(self.lexical_cache, nbytes)),
+            "embedding_cache": (lambda: _cache_bytes(self.embedding_cache),
+                                lambda nbytes: _evict_oldest(self.embedding_cache, nbytes)),
+            "clause_registry": (lambda: self.clause_registry.nbytes, self._evict_clause_registry),
+            "translation_models": (lambda: sum(_model_bytes(m) for m in list(self.translation_models.values())),
+                                   self._evict_translators),
+            "models": (lambda: _model_bytes(self.embedder) + _model_bytes(self.llm), None),
+        }
+    
+    def reset_clause_registry(self):
+        """Start a fresh registry; documents being searched keep the old one until done."""
+        for file_path, store in list(self.embedding_cache.items()):
+            if isinstance(store, SharedClauseEmbeddings):
+                self.embedding_cache.pop(file_path, None)
+        self.clause_registry = ClauseRegistry(
+            config.DEDUP_THRESHOLD, config.MINHASH_PERMUTATIONS, config.MINHASH_BANDS
+        )
+    
+    def _evict_clause_registry(self, nbytes: int) -> int:
+        freed = self.clause_registry.nbytes
+        if freed:
+            self.reset_clause_registry()
+        return freed
+    
+    def _evict_translators(self, nbytes: int) -> int:
+        """Unload translation models, least recently loaded first; they reload on demand."""
+        # A model load holds the lock for seconds; skip rather than stall eviction
+        if not self._translator_lock.acquire(blocking=False):
+            return 0
+        freed = 0
+        try:
+            while self.translation_models and freed < nbytes:
+                lang = next(iter(self.translation_models))
+                freed += _model_bytes(self.translation_models.pop(lang))
+                logger.info(f"Unloaded translation model for {lang}")
+        finally:
+            self._translator_lock.release()
+        return freed
+    
+    def _fuse_rankings(self, query: str, query_embedding: torch.Tensor, dense_results: list,
+                       lexical: BM25Index, clause_embeddings: ClauseEmbeddings) -> list:
+        """Pick TOP_K_CLAUSES by fusing dense and BM25 ranks; scores stay cosine similarities."""
+        dense_scores = dict(dense_results)
+        lexical_ranking = lexical.top(query, config.HYBRID_CANDIDATES)
+        fused = reciprocal_rank_fusion([[i for i, _ in dense_results], lexical_ranking])
+        top = fused[:config.TOP_K_CLAUSES]
+        
+        # Lexical-only picks still need a cosine score for the similarity thresholds
+        missing = [i for i in top if i not in dense_scores]
+        if missing:
+            missing_scores = clause_embeddings.scores(query_embedding, torch.tensor(missing))
+            dense_scores.update(zip(missing, missing_scores.tolist()))
+        return [(i, dense_scores[i]) for i in top]
+    
     def evaluate_decision(self, query_details: Dict[str, Any], relevant_clauses: list, query: str) -> Dict[str, Any]:
         """Evaluate insurance claim decision."""
         procedure = query_details.get("procedure", "").lower()
@@ -605,29 +796,47 @@ class InsuranceClaimsProcessor:
         
         return decision
     
-    def process_query(self, query: str, document_path: str) -> Dict[str, Any]:
-        """Process insurance claim query."""
+    def process_query(self, query: str, document_path: str, query_lang: Optional[str] = None,
+                      clauses: Optional[list] = None) -> Dict[str, Any]:
+        """Process insurance claim query, reusing already parsed clauses if given."""
+        with span("process_query"):
+            return self._process_query(query, document_path, query_lang, clauses)
+    
+    def _process_query(self, query: str, document_path: str, query_lang: Optional[str] = None,
+                       clauses: Optional[list] = None) -> Dict[str, Any]:
+        """Run the claim pipeline: language, clauses, query details, search, decision."""
+        detected_lang, query_lang = query_lang, query_lang or 'en'
         try:
-            logger.info(f"Processing query: {query}")
+            logger.info(f"Processing query: {query[:200]}", extra=SAMPLED)
             
-            # Detect language
-            query_lang = self.detect_language(query)
-            logger.info(f"Detected language: {config.SUPPORTED_LANGUAGES.get(query_lang, 'Unknown')}")
+            # Detect language unless the caller already did (and timed it)
+            if detected_lang is None:
+                with span("detect_language"):
+                    detected_lang = self.detect_language(query)
+            query_lang = detected_lang
+            logger.info(f"Detected language: {config.SUPPORTED_LANGUAGES.get(query_lang, 'Unknown')}", extra=SAMPLED)
+            report_progress("language_detected", language=query_lang)
             
             # Extract clauses from document
-            clauses = self.parse_document(document_path)
+            if clauses is None:
+                with span("parse_document"):
+                    clauses = self.parse_document(document_path)
             if not clauses:
                 error_msg = self.translate_text("No content extracted from document", query_lang)
                 return {"error": error_msg}
             
             # Parse query
-            query_details = self.parse_query(query, query_lang)
+            with span("parse_query"):
+                query_details = self.parse_query(query, query_lang)
             
             # Search for relevant clauses
             relevant_clauses = self.search_clauses(query, clauses, document_path)
+            report_progress("search_done", relevant_clauses=len(relevant_clauses))
             
             # Make decision
-            decision = self.evaluate_decision(query_details, relevant_clauses, query)
+            with span("decision"):
+                decision = self.evaluate_decision(query_details, relevant_clauses, query)
+            report_progress("decision", decision=decision["Decision"])
             
             # Prepare response
             response = {
@@ -655,7 +864,8 @@ class InsuranceClaimsProcessor:
                 "ProcessedAt": datetime.now().isoformat()
             }
             
-            logger.info(f"Processing completed. Decision: {decision['Decision']}")
+            logger.info(f"Processing completed. Decision: {decision['Decision']}",
+                        extra={"decision": decision["Decision"], "clauses": len(clauses), "language": query_lang})
             return response
             
         except Exception as e:
@@ -664,14 +874,90 @@ class InsuranceClaimsProcessor:
             return {"error": error_msg}
 
 
+def _cache_bytes(cache: dict) -> int:
+    return sum(getattr(entry, "nbytes", 0) for entry in list(cache.values()))
+
+def _evict_oldest(cache: dict, nbytes: int) -> int:
+    """Pop entries in insertion order until about nbytes are freed; returns bytes freed."""
+    freed = 0
+    while cache and freed < nbytes:
+        try:
+            freed += getattr(cache.pop(next(iter(cache))), "nbytes", 0)
+        except (KeyError, RuntimeError, StopIteration):
+            break  # Changed concurrently; the next pass will retry
+    return freed
+
+def _model_bytes(model) -> int:
+    """Parameter and buffer bytes of a model, pipeline or SentenceTransformer."""
+    module = getattr(model, "model", model)
+    if not isinstance(module, torch.nn.Module):
+        return 0
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
 # Initialize the processor
 processor = InsuranceClaimsProcessor()
+profiler = RequestProfiler(config.PROFILE_DIR, config.PROFILE_SAMPLE_RATE, config.PROFILE_MAX_FILES)
+result_cache = ResultCache(config.RESULT_CACHE_SIZE, config.RESULT_CACHE_TTL)
+
+# The job pool and memory governor only serve the HTTP API. They start with
+# the app, so importing this module (bulk workers, benchmarks) does not
+# build them.
+jobs: Optional[JobManager] = None
+memory: Optional[MemoryGovernor] = None
+
+def start_services():
+    """Create the background job pool and memory governor, and their gauges."""
+    global jobs, memory
+    if jobs is not None:
+        return
+    jobs = JobManager(config.JOB_WORKERS, config.JOB_QUEUE_SIZE, config.JOB_RETENTION_SECONDS, config.JOB_MAX_RETAINED)
+    
+    memory = MemoryGovernor(
+        config.MEMORY_BUDGET_MB * 2 ** 20 or int(detect_memory_limit() * config.MEMORY_BUDGET_FRACTION),
+        config.MEMORY_QUEUE_TIMEOUT
+    )
+    # Components missing from MEMORY_EVICTION_ORDER are reported, never evicted
+    try:
+        memory.register_components({
+            **processor.memory_components(),
+            "result_cache": (lambda: result_cache.nbytes, result_cache.evict),
+        }, config.MEMORY_EVICTION_ORDER)
+    except ValueError as e:
+        raise ValueError(f"Invalid Config.MEMORY_EVICTION_ORDER: {e}") from None
+    
+    registry.gauge("claims_memory_component_bytes", "Approximate bytes held per cache or model set",
+                   ("component",), callback=memory.component_sizes)
+    registry.gauge("claims_memory_inflight_bytes", "Estimated bytes reserved by documents being processed",
+                   callback=lambda: memory.inflight_bytes)
+    registry.gauge("claims_memory_budget_bytes", "Resident memory budget",
+                   callback=lambda: memory.budget_bytes)
+    registry.gauge("claims_memory_rejected_documents", "Documents rejected because memory stayed over budget",
+                   callback=lambda: memory.rejected)
+    registry.gauge("claims_jobs_pending", "Submitted jobs that are queued or running",
+                   callback=lambda: jobs.pending)
+
+registry.gauge("claims_dedup_clauses_seen", "Clauses passed through near-duplicate detection",
+               callback=lambda: processor.clause_registry.clauses_seen)
+registry.gauge("claims_dedup_canonical_clauses", "Distinct clauses holding an embedding",
+               callback=lambda: len(processor.clause_registry))
+registry.gauge("claims_dedup_bytes_saved", "Embedding memory saved by clause deduplication, net of its index",
+               callback=lambda: processor.clause_registry.stats()["bytes_saved"])
+
+# Cached results are only reused while configuration and models are unchanged
+RESULT_VERSION = fingerprint(asdict(config))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_services()
+    yield
 
 # FastAPI application
 app = FastAPI(
     title="Insurance Claims Processing API",
     description="Multilingual insurance claims processing system with document analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -686,43 +972,195 @@ app.add_middleware(
 @app.post("/process-claim")
 async def process_claim(
     query: str = Form(..., description="Insurance claim query in any supported language"),
-    file: UploadFile = File(..., description="Policy document (PDF, DOCX, TXT, EML)")
+    file: UploadFile = File(..., description="Policy document (PDF, DOCX, TXT, EML)"),
+    x_debug_timings: Optional[str] = Header(None, description="Set to 1 to include per-stage Timings"),
+    x_profile: Optional[str] = Header(None, description="Set to 1 to profile this request"),
+    x_cache_bypass: Optional[str] = Header(None, description="Set to 1 to skip the result cache"),
+    cache_control: Optional[str] = Header(None),
+    profile: Optional[str] = Query(None, description="Set to 1 to profile this request")
 ):
     """Process an insurance claim query against a policy document."""
     
-    temp_file = None
+    INFLIGHT_REQUESTS.inc()
     try:
         # Validate file
         if not file.filename:
             raise HTTPException(status_code=400, detail="No file uploaded")
         
-        # Create temporary file
-        suffix = Path(file.filename).suffix or '.txt'
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        content = await _read_upload(file)
+        logger.info(f"Processing file: {file.filename} ({len(content)} bytes)",
+                    extra={"file_name": file.filename, "bytes": len(content)})
         
-        # Save uploaded file
-        content = await file.read()
-        temp_file.write(content)
-        temp_file.close()
+        # Process the claim off the event loop so identical claims can share a run
+        profiled = profiler.should_profile(_is_truthy(x_profile) or _is_truthy(profile))
+        bypass = _is_truthy(x_cache_bypass) or "no-cache" in (cache_control or "").lower()
+        with collect_timings() as timings:
+            result, cache_status, profile_path = await run_in_threadpool(
+                _process_cached, query, content, file.filename, bypass, profiled
+            )
         
-        logger.info(f"Processing file: {file.filename} ({len(content)} bytes)")
+        REQUESTS_TOTAL.inc(outcome="error" if "error" in result else "success")
+        result = dict(result)  # Never mutate the cached response
+        if _is_truthy(x_debug_timings):
+            result["Timings"] = timings.as_dict()
         
-        # Process the claim
-        result = processor.process_query(query, temp_file.name)
+        headers = {"X-Cache": cache_status.upper()}
+        if profile_path:
+            logger.info(f"Profile written to {profile_path}")
+            headers["X-Profile-Path"] = profile_path
         
-        return JSONResponse(content=result)
+        return JSONResponse(content=result, headers=headers)
         
+    except HTTPException:
+        raise
+    
+    except MemoryBudgetExceeded as e:
+        logger.warning(f"Rejected claim: {e}")
+        REQUESTS_TOTAL.inc(outcome="rejected")
+        return JSONResponse(status_code=503, content={"error": f"Server is at its memory limit: {e}"},
+                            headers={"Retry-After": "10"})
+    
     except Exception as e:
         logger.error(f"API error: {e}")
+        REQUESTS_TOTAL.inc(outcome="exception")
         return JSONResponse(
             status_code=500,
             content={"error": f"Processing failed: {str(e)}"}
         )
     
     finally:
-        # Clean up temporary file
-        if temp_file and os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
+        INFLIGHT_REQUESTS.dec()
+
+async def _read_upload(file: UploadFile, chunk_size: int = 2 ** 20) -> bytes:
+    """Read an upload, rejecting it with 413 as soon as it exceeds MAX_UPLOAD_MB."""
+    limit = config.MAX_UPLOAD_MB * 2 ** 20
+    chunks, size = [], 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > limit:
+            REQUESTS_TOTAL.inc(outcome="rejected")
+            raise HTTPException(status_code=413, detail=f"File exceeds {config.MAX_UPLOAD_MB} MB")
+        chunks.append(chunk)
+
+def _upload_suffix(filename: str) -> str:
+    """File type extraction dispatches on; uploads without an extension are read as text."""
+    return (Path(filename).suffix or '.txt').lower()
+
+def _process_cached(query: str, content: bytes, filename: str, bypass: bool, profiled: bool):
+    """Serve a claim from the result cache or run the pipeline once for it."""
+    # Sampled detail logs are kept or dropped for the whole request
+    with sampled_request(config.LOG_SAMPLE_RATE):
+        with span("detect_language"):
+            query_lang = processor.detect_language(query)
+        key = make_key(document_hash(content), _upload_suffix(filename), query, query_lang, RESULT_VERSION)
+        profile_run = {"path": None}
+        
+        def compute():
+            with profiler.profile(filename, enabled=profiled) as run:
+                result = _process_upload(query, content, filename, query_lang)
+            profile_run.update(run)
+            return result
+        
+        # Answers left untranslated because a model was unavailable are not cached
+        fallbacks = set()
+        token = _translation_fallbacks.set(fallbacks)
+        try:
+            result, status = result_cache.get_or_compute(
+                key, compute, bypass=bypass, cacheable=lambda r: "error" not in r and not fallbacks
+            )
+        finally:
+            _translation_fallbacks.reset(token)
+        CACHE_REQUESTS.inc(cache="result", result=status)
+        report_progress("cache", status=status)
+        return result, status, profile_run["path"]
+
+def _process_upload(query: str, content: bytes, filename: str, query_lang: Optional[str] = None) -> Dict[str, Any]:
+    """Write uploaded bytes to a temporary file and process the claim against it."""
+    suffix = _upload_suffix(filename)
+    estimate = estimate_document_bytes(len(content), suffix == '.pdf',
+                                       config.OCR_LOW_DPI, config.OCR_HIGH_DPI)
+    try:
+        with memory.admit(filename, estimate):
+            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+            try:
+                temp_file.write(content)
+                temp_file.close()
+                return processor.process_query(query, temp_file.name, query_lang)
+            finally:
+                # Clean up temporary file; its path never recurs, so neither do its cache entries
+                if os.path.exists(temp_file.name):
+                    os.unlink(temp_file.name)
+                processor.release_document(temp_file.name)
+    finally:
+        # Caches may have grown past the budget while the document was processed
+        memory.enforce()
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    query: str = Form(..., description="Insurance claim query in any supported language"),
+    file: UploadFile = File(..., description="Policy document (PDF, DOCX, TXT, EML)"),
+    x_cache_bypass: Optional[str] = Header(None, description="Set to 1 to skip the result cache"),
+    cache_control: Optional[str] = Header(None)
+):
+    """Queue a claim for background processing and return its job ID immediately."""
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    
+    content = await _read_upload(file)
+    bypass = _is_truthy(x_cache_bypass) or "no-cache" in (cache_control or "").lower()
+    try:
+        job = jobs.submit(_run_job, query, content, file.filename, bypass, description=file.filename)
+    except JobQueueFull as e:
+        REQUESTS_TOTAL.inc(outcome="rejected")
+        return JSONResponse(status_code=503, content={"error": f"Job queue is full: {e}"},
+                            headers={"Retry-After": "5"})
+    
+    logger.info(f"Queued job {job.id} for {file.filename} ({len(content)} bytes)",
+                extra={"job_id": job.id, "file_name": file.filename, "bytes": len(content)})
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events"
+    }
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str, events: bool = Query(False, description="Include all progress events")):
+    """Status, latest progress and (once finished) the result of a job."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.summary(include_events=events)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events stream of job progress, ending with the result."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    # Reconnecting clients resume after the last event they received
+    cursor = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        stream_events(job, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _run_job(query: str, content: bytes, filename: str, bypass: bool) -> Dict[str, Any]:
+    """Job body: the same cached pipeline as /process-claim, counted like a request."""
+    INFLIGHT_REQUESTS.inc()
+    try:
+        result, _, _ = _process_cached(query, content, filename, bypass, profiler.should_profile(False))
+        REQUESTS_TOTAL.inc(outcome="error" if "error" in result else "success")
+        return result
+    except Exception:
+        REQUESTS_TOTAL.inc(outcome="exception")
+        raise
+    finally:
+        INFLIGHT_REQUESTS.dec()
 
 @app.get("/health")
 async def health_check():
@@ -734,6 +1172,26 @@ async def supported_languages():
     """Get list of supported languages."""
     return {"languages": config.SUPPORTED_LANGUAGES}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage timings, cache and model metrics in Prometheus text format."""
+    # Gauge callbacks size caches and models; keep that off the event loop
+    return PlainTextResponse(await run_in_threadpool(registry.render), media_type="text/plain; version=0.0.4")
+
+@app.get("/memory")
+async def memory_usage():
+    """Resident memory, budget, bytes per cache/model and in-flight document reservations."""
+    return await run_in_threadpool(memory.usage)
+
+@app.get("/dedup-stats")
+async def dedup_stats():
+    """Embedding compute and memory saved by near-duplicate clause deduplication."""
+    return {"enabled": config.CLAUSE_DEDUP, **processor.clause_registry.stats()}
+
+def _is_truthy(value: Optional[str]) -> bool:
+    """Interpret an optional header or flag value as a boolean."""
+    return bool(value) and value.strip().lower() in ("1", "true", "yes", "on")
+
 if __name__ == "__main__":
     # For development
     uvicorn.run(
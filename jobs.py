@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Background claim jobs for the Insurance Claims Processing System.
+Claims submitted as jobs run on a bounded worker pool; pipeline stages report
+progress through report_progress(), which clients follow as Server-Sent
+Events. Finished jobs are kept for a limited time.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+QUEUED, RUNNING, COMPLETED, FAILED = "queued", "running", "completed", "failed"
+FINISHED = (COMPLETED, FAILED)
+
+_current_job: ContextVar[Optional["Job"]] = ContextVar("current_job", default=None)
+
+
+def report_progress(stage: str, **details):
+    """Record a progress event for the job running in this context, if any."""
+    job = _current_job.get()
+    if job is not None:
+        job.add_event(stage, **details)
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+class Job:
+    """One submitted claim: status, progress events and the final result."""
+
+    def __init__(self, description: str = ""):
+        self.id = uuid.uuid4().hex
+        self.description = description
+        self.status = QUEUED
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._waiters: List[tuple] = []
+        self.add_event(QUEUED)
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    def add_event(self, stage: str, **details):
+        with self._lock:
+            self._append(stage, details)
+
+    def finish(self, status: str, result: Dict[str, Any]):
+        """Store the result; the status change and its event appear together."""
+        with self._lock:
+            self.result = result
+            self.finished = time.time()
+            self.status = status
+            self._append(status, {})
+
+    def _append(self, stage: str, details: Dict[str, Any]):
+        self.events.append({
+            "seq": len(self.events),
+            "stage": stage,
+            "elapsed_ms": round((time.time() - self.created) * 1000, 1),
+            **details,
+        })
+        for loop, event in self._waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def events_since(self, cursor: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self.events[cursor:]
+
+    def summary(self, include_events: bool = False) -> Dict[str, Any]:
+        summary = {
+            "job_id": self.id,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": self.events_since(len(self.events) - 1)[0],
+        }
+        if self.done:
+            summary["result"] = self.result
+        if include_events:
+            summary["events"] = self.events_since(0)
+        return summary
+
+    def _subscribe(self) -> asyncio.Event:
+        event = asyncio.Event()
+        with self._lock:
+            self._waiters.append((asyncio.get_running_loop(), event))
+        return event
+
+    def _unsubscribe(self, event: asyncio.Event):
+        with self._lock:
+            self._waiters = [waiter for waiter in self._waiters if waiter[1] is not event]
+
+
+class JobManager:
+    """Bounded worker pool plus time- and count-limited retention of finished jobs."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 32,
+                 retention_seconds: float = 900, max_retained: int = 1000):
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.max_retained = max_retained
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="claim-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.done)
+
+    def submit(self, fn: Callable[..., Dict[str, Any]], *args, description: str = "") -> Job:
+        """Queue fn(*args) as a job; raises JobQueueFull when max_pending jobs are unfinished."""
+        with self._lock:
+            self._prune()
+            if sum(1 for job in self._jobs.values() if not job.done) >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} jobs already pending")
+            job = Job(description)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, fn: Callable[..., Dict[str, Any]], args: tuple):
+        token = _current_job.set(job)
+        job.started = time.time()
+        job.status = RUNNING
+        job.add_event(RUNNING)
+        try:
+            result = fn(*args)
+            job.finish(FAILED if "error" in result else COMPLETED, result)
+        except Exception as e:
+            job.finish(FAILED, {"error": f"Processing failed: {e}"})
+        finally:
+            _current_job.reset(token)
+
+    def _prune(self):
+        """Drop finished jobs past retention, oldest first, and enforce max_retained."""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.done]
+        excess = len(self._jobs) - self.max_retained
+        for job in finished:
+            if now - job.finished > self.retention_seconds or excess > 0:
+                del self._jobs[job.id]
+                excess -= 1
+
+
+async def stream_events(job: Job, cursor: int = 0, heartbeat_seconds: float = 15.0) -> AsyncIterator[str]:
+    """Server-Sent Events for a job from event number cursor, then a final result event."""
+    while True:
+        waiter = job._subscribe()
+        try:
+            for event in job.events_since(cursor):
+                cursor = event["seq"] + 1
+                yield f"id: {event['seq']}\nevent: progress\ndata: {json.dumps(event)}\n\n"
+            if job.done and not job.events_since(cursor):
+                yield f"event: result\ndata: {json.dumps(job.summary(), default=str)}\n\n"
+                return
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+        finally:
+            job._unsubscribe(waiter)
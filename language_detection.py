@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tiered language detection for the Insurance Claims Processing System.
+Non-Latin scripts are identified from Unicode ranges, clear-cut Latin text
+from stopwords, and only ambiguous Latin text falls through to langdetect.
+Results are memoised per normalised text.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from langdetect import detect
+
+# (start, end, script) code point ranges
+SCRIPT_RANGES = (
+    (0x0400, 0x052F, "cyrillic"),
+    (0x0600, 0x06FF, "arabic"),
+    (0x0750, 0x077F, "arabic"),
+    (0x08A0, 0x08FF, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x3040, 0x309F, "kana"),
+    (0x30A0, 0x30FF, "kana"),
+    (0x3130, 0x318F, "hangul"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xAC00, 0xD7AF, "hangul"),
+    (0xF900, 0xFAFF, "han"),
+    (0xFB50, 0xFDFF, "arabic"),
+    (0xFE70, 0xFEFF, "arabic"),
+)
+
+SCRIPT_LANGUAGES = {
+    "cyrillic": "ru", "arabic": "ar", "devanagari": "hi",
+    "hangul": "ko", "kana": "ja", "han": "zh",
+}
+
+# Short, high-precision function words for the Latin-script languages we
+# support. Each word belongs to one language only: words shared between them
+# ("de", "la", "con", "para") or with English ("as", "do", "in") would let a
+# couple of common words outvote the rest of the sentence.
+STOPWORDS = {
+    "en": {"the", "and", "of", "is", "for", "with", "my", "was", "after", "under", "what", "have", "from", "this"},
+    "es": {"el", "los", "las", "y", "muy", "pero", "fue", "tengo", "hasta", "después", "cuál", "mis", "cuando", "usted"},
+    "fr": {"le", "les", "des", "du", "et", "avec", "pour", "une", "est", "je", "mon", "dans", "sur", "après"},
+    "de": {"der", "und", "mit", "für", "ein", "eine", "ist", "nach", "mein", "meiner", "ich", "nicht", "bei", "wurde"},
+    "pt": {"os", "dos", "em", "uma", "não", "meu", "minha", "foi", "ao", "após", "tenho", "também", "pelo", "pela"},
+    "it": {"il", "gli", "della", "di", "è", "che", "sono", "dopo", "nel", "mio", "anche", "questa", "stato", "perché"},
+}
+
+LANGUAGE_ALIASES = {'zh-cn': 'zh', 'zh-tw': 'zh'}
+
+logger = logging.getLogger(__name__)
+
+
+def script_counts(text: str) -> Tuple[Dict[str, int], int]:
+    """Count letters per non-Latin script and the number of Latin letters."""
+    counts: Dict[str, int] = {}
+    latin = 0
+    for char in text:
+        code = ord(char)
+        if code < 0x0250:
+            if char.isalpha():
+                latin += 1
+            continue
+        for start, end, script in SCRIPT_RANGES:
+            if start <= code <= end:
+                counts[script] = counts.get(script, 0) + 1
+                break
+    return counts, latin
+
+
+def detect_by_script(text: str, min_share: float = 0.3) -> Optional[str]:
+    """Language implied by the dominant non-Latin script, if there is one."""
+    counts, latin = script_counts(text)
+    total = sum(counts.values())
+    if not total or total < min_share * (total + latin):
+        return None
+    # Japanese mixes kana with Han; any kana means Japanese
+    if counts.get("kana"):
+        return "ja"
+    return SCRIPT_LANGUAGES[max(counts, key=counts.get)]
+
+
+def detect_by_stopwords(text: str, min_hits: int = 2) -> Optional[str]:
+    """Latin-script language when its stopwords clearly outnumber the others."""
+    words = re.findall(r"[^\W\d_]+", text.lower())
+    hits = {lang: sum(1 for word in words if word in vocabulary) for lang, vocabulary in STOPWORDS.items()}
+    ranked = sorted(hits.items(), key=lambda item: item[1], reverse=True)
+    (best, best_hits), (_, runner_up) = ranked[0], ranked[1]
+    if best_hits >= min_hits and best_hits >= 2 * runner_up + 1:
+        return best
+    return None
+
+
+def detect_with_langdetect(text: str) -> str:
+    """Probabilistic n-gram detection with langdetect."""
+    detected = detect(text)
+    return LANGUAGE_ALIASES.get(detected, detected)
+
+
+class LanguageDetector:
+    """Script-range, stopword and langdetect tiers behind an LRU memo."""
+
+    def __init__(self, supported_languages: Iterable[str], cache_size: int = 4096,
+                 default: str = 'en'):
+        self.supported = set(supported_languages)
+        self.default = default
+        self._detect_cached = lru_cache(maxsize=cache_size)(self._detect_normalized)
+
+    def detect(self, text: str) -> str:
+        """Detect the language of text, defaulting when unsupported or unclear."""
+        if not text or len(text.strip()) < 3:
+            return self.default
+        return self._detect_cached(self.normalize(text))
+
+    def detect_with_method(self, text: str) -> Tuple[str, str]:
+        """Uncached detection that also reports which tier decided."""
+        if not text or len(text.strip()) < 3:
+            return self.default, "default"
+        return self._detect_tiers(self.normalize(text))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        # Same cleaning and length limit as the original langdetect path
+        text = re.sub(r'[^\w\s]', ' ', text)
+        return re.sub(r'\s+', ' ', text)[:1000].strip()
+
+    def cache_info(self):
+        return self._detect_cached.cache_info()
+
+    def _detect_normalized(self, text: str) -> str:
+        return self._detect_tiers(text)[0]
+
+    def _detect_tiers(self, text: str) -> Tuple[str, str]:
+        for method, detector in (("script", detect_by_script), ("stopwords", detect_by_stopwords)):
+            language = detector(text)
+            if language:
+                return self._supported(language), method
+        try:
+            return self._supported(detect_with_langdetect(text)), "langdetect"
+        except Exception as e:
+            logger.warning(f"Language detection failed: {e}, defaulting to English.")
+            return self.default, "default"
+
+    def _supported(self, language: str) -> str:
+        return language if language in self.supported else self.default
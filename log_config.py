@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Logging setup for the Insurance Claims Processing System.
+Request threads only enqueue records; a background listener formats them as
+JSON lines and writes them to a size- or time-rotated file and the console.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+# Attributes every LogRecord has; anything else came from ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Handler installed by setup_logging(); logging is configured once per process
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+# Whether the current request's sampled records are kept; None outside a request
+_request_sampled: ContextVar[Optional[bool]] = ContextVar("request_sampled", default=None)
+
+
+@contextmanager
+def sampled_request(rate: float):
+    """Decide once whether the enclosed request keeps its sampled records, so traces are whole."""
+    token = _request_sampled.set(rate >= 1.0 or random.random() < rate)
+    try:
+        yield
+    finally:
+        _request_sampled.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "sample":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of records logged with ``extra={"sample": True}``.
+    Inside sampled_request() the request's decision applies to all of its
+    records; outside a request each record is sampled on its own.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sample", False):
+            return True
+        keep = _request_sampled.get()
+        if keep is None:
+            keep = self.rate >= 1.0 or random.random() < self.rate
+        return keep
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(log_file: Optional[str] = "insurance_claims.log", level: str = "INFO",
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                  rotate_when: Optional[str] = None, json_format: bool = True,
+                  sample_rate: float = 1.0, queue_size: int = 10000) -> DroppingQueueHandler:
+    """
+    Route root logging through a bounded queue to a background writer.
+
+    Files rotate by time when ``rotate_when`` is set (e.g. "midnight"),
+    otherwise by size at ``max_bytes``; with no ``log_file`` records only go
+    to stderr. Logging is set up once per process: later calls return the
+    existing handler, so worker processes that must not share the rotating
+    file can configure stderr logging before importing the API module.
+    """
+    global _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+
+    handlers = [logging.StreamHandler()]
+    if log_file and rotate_when:
+        handlers.append(logging.handlers.TimedRotatingFileHandler(
+            log_file, when=rotate_when, backupCount=backup_count, encoding="utf-8"))
+    elif log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"))
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(
+        '%(asctime)s - %(levelname)s - %(message)s')
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    # Sample before enqueueing so dropped records cost nothing downstream
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener.start()
+    atexit.register(listener.stop)
+    _queue_handler = queue_handler
+    return queue_handler
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Memory budget governor for the Insurance Claims Processing System.
+Components (caches, models) register a size function and an eviction
+function; in-flight documents reserve an estimate of their footprint. When
+resident memory plus reservations would exceed the budget, caches are
+evicted in priority order and new documents wait for memory, then are
+rejected.
+"""
+
+import ctypes
+import gc
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+
+from metrics import process_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+# Rendered pages are sized as US Letter at 3 bytes (RGB) per pixel
+PAGE_AREA_SQUARE_INCHES = 8.5 * 11
+
+
+class MemoryBudgetExceeded(Exception):
+    """Raised when a document cannot be admitted within the memory budget."""
+
+
+def detect_memory_limit() -> int:
+    """Container (cgroup) memory limit in bytes, else physical memory."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            # cgroup v1 reports "no limit" as a huge number
+            if value != "max" and int(value) < 1 << 60:
+                return int(value)
+        except (OSError, ValueError):
+            continue
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def estimate_document_bytes(content_bytes: int, is_pdf: bool, low_dpi: int, high_dpi: int) -> int:
+    """
+    Peak memory for processing one upload: the buffer, its temp-file copy,
+    extracted and cleaned text, and for PDFs one page rendered at low DPI plus
+    its high-DPI re-render when OCR escalates (pages are rasterised one at a
+    time).
+    """
+    estimate = 4 * content_bytes
+    if is_pdf:
+        estimate += int(PAGE_AREA_SQUARE_INCHES * (low_dpi * low_dpi + high_dpi * high_dpi) * 3)
+    return estimate
+
+
+def release_freed_memory():
+    """Collect garbage and ask glibc to return freed heap pages so RSS reflects evictions."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class _Component:
+    def __init__(self, name: str, size_fn: Callable[[], int],
+                 evict_fn: Optional[Callable[[int], int]]):
+        self.name = name
+        self.size_fn = size_fn
+        self.evict_fn = evict_fn
+        self.evictions = 0
+
+    def size(self) -> int:
+        try:
+            return int(self.size_fn())
+        except Exception as e:
+            logger.warning(f"Could not size {self.name}: {e}")
+            return 0
+
+
+class MemoryGovernor:
+    """Tracks memory per component and admits documents against an RSS budget."""
+
+    def __init__(self, budget_bytes: int, queue_timeout: float = 30.0,
+                 rss_fn: Callable[[], float] = process_rss_bytes):
+        self.budget_bytes = budget_bytes
+        self.queue_timeout = queue_timeout
+        self.rss_fn = rss_fn
+        self.rejected = 0
+        self.queued = 0
+        self._components: List[_Component] = []
+        self._reservations: Dict[int, tuple] = {}
+        self._next_id = 0
+        self._condition = threading.Condition()
+        # Held while evicting, outside _condition; one eviction runs at a time
+        self._evict_lock = threading.Lock()
+        self._unreachable_warned = False
+
+    def register(self, name: str, size_fn: Callable[[], int],
+                 evict_fn: Optional[Callable[[int], int]] = None):
+        """
+        Add a component. Components are evicted in registration order;
+        ``evict_fn(bytes_needed)`` frees what it can and returns bytes freed.
+        """
+        self._components.append(_Component(name, size_fn, evict_fn))
+
+    def register_components(self, components: Dict[str, tuple], eviction_order: Sequence[str]):
+        """
+        Register ``{name: (size_fn, evict_fn)}``: names in ``eviction_order`` are
+        evicted in that order, the rest are only reported.
+        """
+        unknown = [name for name in eviction_order if name not in components]
+        if unknown:
+            raise ValueError(f"Unknown memory component(s) {unknown} in eviction order; "
+                             f"valid names are {sorted(components)}")
+        for name in dict.fromkeys(eviction_order):
+            self.register(name, *components[name])
+        for name, (size_fn, _) in components.items():
+            if name not in eviction_order:
+                self.register(name, size_fn)
+
+    def component_sizes(self) -> Dict[str, int]:
+        return {component.name: component.size() for component in self._components}
+
+    @property
+    def inflight_bytes(self) -> int:
+        with self._condition:
+            return sum(nbytes for _, nbytes in self._reservations.values())
+
+    def usage(self) -> Dict[str, object]:
+        """Current bytes per component, in-flight reservations and the budget."""
+        with self._condition:
+            inflight = [{"document": label, "bytes": nbytes} for label, nbytes in self._reservations.values()]
+        return {
+            "rss_bytes": int(self.rss_fn()),
+            "budget_bytes": self.budget_bytes,
+            "components": self.component_sizes(),
+            "evictions": {component.name: component.evictions for component in self._components},
+            "inflight_documents": len(inflight),
+            "inflight_bytes": sum(item["bytes"] for item in inflight),
+            "inflight": inflight,
+            "queued_total": self.queued,
+            "rejected_total": self.rejected,
+        }
+
+    @contextmanager
+    def admit(self, label: str, nbytes: int):
+        """
+        Reserve nbytes for one document while it is processed.
+
+        Over budget, caches are evicted first; if that is not enough the
+        document waits for in-flight work to finish, up to queue_timeout,
+        then MemoryBudgetExceeded is raised. A document is always admitted
+        when nothing else is in flight so the service keeps making progress.
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        waited = False
+        while True:
+            with self._condition:
+                over = self._projected(nbytes) - self.budget_bytes
+            if over > 0:
+                self._evict(over, nbytes)
+
+            with self._condition:
+                if self._fits(nbytes) or not self._reservations:
+                    reservation = self._next_id
+                    self._next_id += 1
+                    self._reservations[reservation] = (label, nbytes)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise MemoryBudgetExceeded(
+                        f"{label} needs ~{nbytes // 2 ** 20} MiB; "
+                        f"{self._projected(0) // 2 ** 20} MiB of {self.budget_bytes // 2 ** 20} MiB in use"
+                    )
+                if not waited:
+                    self.queued += 1
+                    waited = True
+                    logger.info(f"Waiting for memory to admit {label}")
+                self._condition.wait(remaining)
+        try:
+            yield
+        finally:
+            with self._condition:
+                del self._reservations[reservation]
+                self._condition.notify_all()
+
+    def enforce(self) -> int:
+        """Evict caches until RSS is back under budget; returns bytes freed."""
+        with self._condition:
+            over = self._projected(0) - self.budget_bytes
+        return self._evict(over) if over > 0 else 0
+
+    def _projected(self, nbytes: int) -> int:
+        # Reservations overlap with memory already in RSS, so this errs high
+        return int(self.rss_fn()) + sum(size for _, size in self._reservations.values()) + nbytes
+
+    def _fits(self, nbytes: int) -> bool:
+        return self._projected(nbytes) <= self.budget_bytes
+
+    def _evict(self, needed: int, nbytes: int = 0) -> int:
+        """
+        Evict components in priority order until about `needed` bytes are freed.
+
+        Runs without holding _condition, so admissions and releases are not
+        blocked behind eviction callbacks or garbage collection. Skipped while
+        another eviction is running, and when evicting every cache still
+        could not get under budget (e.g. the models alone exceed it).
+        """
+        if not self._evict_lock.acquire(blocking=False):
+            return 0
+        freed = 0
+        try:
+            evictable = [component for component in self._components if component.evict_fn is not None]
+            with self._condition:
+                projected = self._projected(nbytes)
+            floor = projected - sum(component.size() for component in evictable)
+            if floor > self.budget_bytes:
+                if not self._unreachable_warned:
+                    self._unreachable_warned = True
+                    logger.warning(f"Memory stays over budget even with every cache evicted "
+                                   f"(~{floor // 2 ** 20} MiB of {self.budget_bytes // 2 ** 20} MiB); "
+                                   f"skipping eviction")
+                return 0
+            self._unreachable_warned = False
+
+            for component in evictable:
+                if freed >= needed:
+                    break
+                try:
+                    released = component.evict_fn(needed - freed)
+                except Exception as e:
+                    logger.warning(f"Eviction of {component.name} failed: {e}")
+                    continue
+                if released:
+                    component.evictions += 1
+                    freed += released
+                    logger.info(f"Evicted ~{released // 1024} KiB from {component.name} to stay within memory budget")
+            if freed:
+                release_freed_memory()
+        finally:
+            self._evict_lock.release()
+        if freed:
+            with self._condition:
+                self._condition.notify_all()
+        return freed
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Opt-in request profiling for the Insurance Claims Processing System.
+Wraps claim processing in cProfile for forced or sampled requests, writes
+one .prof file per request and aggregates them into top-N hot functions.
+
+Usage:
+    python profiling.py [profile_dir] [--top 25] [--sort cumulative|tottime|calls]
+"""
+
+import argparse
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfiler:
+    """Profiles selected requests and keeps a bounded directory of results."""
+
+    def __init__(self, directory: str = "profiles", sample_rate: float = 0.0, max_files: int = 200):
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        # cProfile cannot run two profilers at once; extra requests go unprofiled
+        self._lock = threading.Lock()
+
+    def should_profile(self, forced: bool = False) -> bool:
+        """Decide whether the current request is profiled."""
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    @contextmanager
+    def profile(self, label: str = "request", enabled: bool = True):
+        """
+        Profile the enclosed block if enabled and no other profile is running.
+
+        Yields a dict whose ``path`` is set to the written profile, or None.
+        """
+        result = {"path": None}
+        if not enabled or not self._lock.acquire(blocking=False):
+            yield result
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                yield result
+            finally:
+                profiler.disable()
+                try:
+                    result["path"] = str(self._write(profiler, label))
+                except OSError as e:
+                    logger.warning(f"Failed to write profile for {label}: {e}")
+        finally:
+            self._lock.release()
+
+    def _write(self, profiler: cProfile.Profile, label: str) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        safe_label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label)[:60] or "request"
+        path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:6]}-{safe_label}.prof"
+        profiler.dump_stats(str(path))
+        self._prune()
+        return path
+
+    def _prune(self):
+        """Delete the oldest profiles beyond max_files."""
+        files = sorted(self.directory.glob("*.prof"), key=lambda p: p.stat().st_mtime)
+        for old in files[:max(len(files) - self.max_files, 0)]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def aggregate_profiles(directory: str, top: int = 25, sort: str = "cumulative",
+                       stream=None) -> Optional[pstats.Stats]:
+    """Merge every profile in a directory and print the top-N functions."""
+    files = sorted(str(p) for p in Path(directory).glob("*.prof"))
+    if not files:
+        print(f"No profiles found in {directory}", file=stream or sys.stdout)
+        return None
+
+    stats = pstats.Stats(files[0], stream=stream or sys.stdout)
+    for path in files[1:]:
+        stats.add(path)
+    print(f"Aggregated {len(files)} profiles from {directory}", file=stream or sys.stdout)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return stats
+
+
+def main():
+    """Aggregate saved request profiles from the command line."""
+    parser = argparse.ArgumentParser(description="Aggregate per-request claim profiles")
+    parser.add_argument("directory", nargs="?", default="profiles", help="Directory of .prof files")
+    parser.add_argument("--top", type=int, default=25, help="Number of functions to show")
+    parser.add_argument("--sort", default="cumulative", choices=["cumulative", "tottime", "calls"],
+                        help="Sort order for the report")
+    args = parser.parse_args()
+
+    if aggregate_profiles(args.directory, args.top, args.sort) is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+End-to-end claim result cache for the Insurance Claims Processing System.
+An LRU cache with TTL expiry and single-flight de-duplication, so concurrent
+identical claims share one pipeline run.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+HIT, MISS, SHARED, BYPASS = "hit", "miss", "shared", "bypass"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query: NFKC with whitespace collapsed. Case is kept
+    because cached responses echo details extracted from the query text.
+    """
+    return re.sub(r'\s+', ' ', unicodedata.normalize("NFKC", query)).strip()
+
+
+def document_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def fingerprint(settings: Dict[str, Any]) -> str:
+    """Short stable hash of configuration and model settings."""
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def make_key(doc_hash: str, suffix: str, query: str, language: str, version: str) -> str:
+    """Cache key for a claim; the suffix is part of it because extraction dispatches on file type."""
+    return "|".join((doc_hash, suffix.lower(), language, version,
+                     hashlib.sha256(normalize_query(query).encode()).hexdigest()))
+
+
+def _result_bytes(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+class _Flight:
+    """A computation in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache with single-flight computation."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (stored at, value, JSON size)
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str):
+        with self._lock:
+            return self._get_locked(key)
+
+    def put(self, key: str, value):
+        size = _result_bytes(value)
+        with self._lock:
+            self._put_locked(key, value, size)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held by cached results, measured as their JSON size when stored."""
+        return self._nbytes
+
+    def evict(self, nbytes: int) -> int:
+        """Drop least recently used entries until about nbytes are freed; returns bytes freed."""
+        freed = 0
+        with self._lock:
+            while self._entries and freed < nbytes:
+                freed += self._pop_oldest_locked()
+        return freed
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], bypass: bool = False,
+                       cacheable: Callable[[Any], bool] = lambda value: True) -> Tuple[Any, str]:
+        """
+        Return (value, status) for key, computing it at most once at a time.
+
+        ``bypass`` skips the lookup and always computes, refreshing the entry.
+        Values rejected by ``cacheable`` are returned but not stored.
+        """
+        with self._lock:
+            if not bypass:
+                value = self._get_locked(key)
+                if value is not None:
+                    return value, HIT
+            flight = self._flights.get(key)
+            leader = flight is None or bypass
+            if leader:
+                flight = _Flight()
+                if not bypass:
+                    self._flights[key] = flight
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, SHARED
+
+        try:
+            flight.value = compute()
+            if cacheable(flight.value):
+                self.put(key, flight.value)
+            return flight.value, BYPASS if bypass else MISS
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def _get_locked(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value, size = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self._nbytes -= size
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_locked(self, key: str, value, size: int):
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._nbytes -= previous[2]
+        self._entries[key] = (time.monotonic(), value, size)
+        self._entries.move_to_end(key)
+        self._nbytes += size
+        while len(self._entries) > self.max_entries:
+            self._pop_oldest_locked()
+
+    def _pop_oldest_locked(self) -> int:
+        _, (_, _, size) = self._entries.popitem(last=False)
+        self._nbytes -= size
+        return size
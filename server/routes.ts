@@ -26,6 +26,23 @@ const upload = multer({
 
 // Remove the mock processClaimQuery function
 
+const PYTHON_API_URL = 'http://127.0.0.1:8000';
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_DEADLINE_MS = 10 * 60 * 1000; // Large scanned policies can take minutes
+
+// Poll a Python API job until it finishes and return its result
+async function waitForJob(jobId: string) {
+  const deadline = Date.now() + JOB_DEADLINE_MS;
+  while (Date.now() < deadline) {
+    const { data } = await axios.get(`${PYTHON_API_URL}/jobs/${jobId}`, { timeout: 10000 });
+    if (data.status === 'completed' || data.status === 'failed') {
+      return data.result;
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+  throw new Error(`Job ${jobId} did not finish within ${JOB_DEADLINE_MS / 1000}s`);
+}
+
 export async function registerRoutes(app: Express): Promise<Server> {
   
   // Submit claim query with optional PDF
@@ -94,37 +111,47 @@ This is a sample insurance policy document containing standard terms and conditi
         });
       }
 
-      // Send to Python API
-      console.log("Sending request to Python API...");
-      const pythonApiUrl = 'http://127.0.0.1:8000/process-claim';
+      // Submit as a background job so processing time is not bound by the request timeout
+      console.log("Submitting job to Python API...");
       
       try {
-        const response = await axios.post(pythonApiUrl, form, {
+        const submitted = await axios.post(`${PYTHON_API_URL}/jobs`, form, {
           headers: form.getHeaders(),
           maxContentLength: Infinity,
           maxBodyLength: Infinity,
-          timeout: 30000, // 30 second timeout
+          timeout: 30000, // 30 second timeout for the upload only
         });
+        console.log("Python API job queued:", submitted.data.job_id);
         
-        console.log("Python API response received:", response.status);
-        console.log("Response data:", JSON.stringify(response.data, null, 2));
+        const result = await waitForJob(submitted.data.job_id);
+        
+        console.log("Python API result received:", {
+          decision: result?.Decision,
+          clauses: result?.RelevantClauses?.length ?? 0,
+          error: result?.error,
+        });
         
         // Store the query and response
         const claimQuery = await storage.createClaimQuery({
           query,
           pdfFileName,
-          response: response.data,
+          response: result,
         });
         
         console.log("Claim stored in database with ID:", claimQuery.id);
         
         res.json({
           id: claimQuery.id,
-          ...response.data
+          ...result
         });
       } catch (pythonError) {
         console.error("Error calling Python API:", pythonError);
-        if (pythonError.response) {
+        if (pythonError.response?.status === 503) {
+          return res.status(503).json({
+            message: "Python API is busy, please retry shortly",
+            error: pythonError.response.data
+          });
+        } else if (pythonError.response) {
           console.error("Python API error response:", pythonError.response.data);
           return res.status(500).json({ 
             message: "Python API error", 
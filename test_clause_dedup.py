@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests for near-duplicate clause deduplication across documents
+"""
+
+import threading
+
+import torch
+from clause_dedup import ClauseRegistry
+
+EMBEDDING_DIM = 384
+
+GRIEVANCE = ("In case of any grievance the insured person may contact the company "
+             "through the grievance cell within 15 days of the claim decision.")
+# Same clause as extracted by OCR from another policy
+GRIEVANCE_OCR = ("In case of any grievancc the insured person may contact the cornpany "
+                 "through the grievance cell within 15 days of the claim decision")
+FREE_LOOK = ("The policyholder has a free look period of 15 days from receipt of the "
+             "policy document to review its terms and conditions.")
+FREE_LOOK_30 = FREE_LOOK.replace("15 days", "30 days")
+
+
+class CountingEncoder:
+    """Deterministic stand-in for the sentence embedder that counts encoded clauses."""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def __call__(self, texts):
+        self.encoded += len(texts)
+        rows = [torch.randn(EMBEDDING_DIM, generator=torch.Generator().manual_seed(hash(t) % 2 ** 31))
+                for t in texts]
+        return torch.stack(rows)
+
+
+def test_near_duplicates_share_embeddings():
+    """OCR variants of a clause in another document reuse its embedding."""
+    registry = ClauseRegistry()
+    encoder = CountingEncoder()
+    first = registry.embed([GRIEVANCE, FREE_LOOK], encoder)
+    second = registry.embed([GRIEVANCE_OCR, FREE_LOOK, "Dental treatment is excluded."], encoder)
+
+    assert encoder.encoded == 3, f"expected 3 encoded clauses, got {encoder.encoded}"
+    assert second.ids.tolist()[:2] == first.ids.tolist()
+    stats = registry.stats()
+    print(f"Stats: {stats}")
+    assert stats["near_duplicates"] == 1 and stats["exact_duplicates"] == 1
+    assert stats["embeddings_saved"] == 2
+    assert 0 < stats["index_bytes"] <= registry.nbytes
+    assert stats["bytes_saved"] == 2 * EMBEDDING_DIM * 4 - stats["index_bytes"]
+    print("✅ Near-duplicate clauses share one embedding")
+
+
+def test_different_numbers_stay_separate():
+    """Clauses differing only in a number keep their own embeddings."""
+    registry = ClauseRegistry()
+    shared = registry.embed([FREE_LOOK, FREE_LOOK_30], CountingEncoder())
+    assert len(set(shared.ids.tolist())) == 2
+    print("✅ Numeric variants are not merged")
+
+
+def test_search_matches_direct_scoring():
+    """Searching shared embeddings ranks clauses like scoring them directly."""
+    registry = ClauseRegistry()
+    encoder = CountingEncoder()
+    texts = [GRIEVANCE, FREE_LOOK, FREE_LOOK_30, "Dental treatment is excluded."]
+    shared = registry.embed(texts, encoder)
+    query = torch.randn(EMBEDDING_DIM)
+
+    expected = torch.nn.functional.normalize(encoder(texts), dim=-1) @ torch.nn.functional.normalize(query, dim=0)
+    scores, indices = shared.search(query, 2)
+    assert indices.tolist() == torch.argsort(expected, descending=True)[:2].tolist()
+    assert torch.allclose(scores, expected[indices], atol=1e-5)
+
+    _, indices = shared.search(query, 1, candidates=torch.tensor([1, 3]))
+    assert indices.tolist()[0] in (1, 3)
+    print("✅ Search over shared embeddings matches direct scoring")
+
+
+def test_failed_encoding_rolls_back():
+    """A failed encode leaves no canonical clause without an embedding."""
+    registry = ClauseRegistry()
+
+    def failing(texts):
+        raise RuntimeError("encoder unavailable")
+
+    try:
+        registry.embed([GRIEVANCE], failing)
+        assert False, "expected the encoder error to propagate"
+    except RuntimeError:
+        pass
+    encoder = CountingEncoder()
+    shared = registry.embed([GRIEVANCE], encoder)
+    assert encoder.encoded == 1 and len(registry) == 1 and shared.ids.tolist() == [0]
+    print("✅ Registry is unchanged after a failed encode")
+
+
+def test_encoding_does_not_block_lookups():
+    """Known clauses resolve while another document's new clauses are being encoded."""
+    registry = ClauseRegistry()
+    registry.embed([GRIEVANCE], CountingEncoder())
+    encoding, release = threading.Event(), threading.Event()
+
+    def slow(texts):
+        encoding.set()
+        release.wait(5)
+        return CountingEncoder()(texts)
+
+    writer = threading.Thread(target=registry.embed, args=([FREE_LOOK], slow))
+    writer.start()
+    try:
+        assert encoding.wait(5)
+        lookups = []
+        reader = threading.Thread(target=lambda: lookups.append(registry.embed([GRIEVANCE_OCR], CountingEncoder())))
+        reader.start()
+        reader.join(2)
+        assert lookups and lookups[0].ids.tolist() == [0], "lookup waited for another document's encode"
+    finally:
+        release.set()
+        writer.join()
+    assert len(registry) == 2
+    print("✅ Lookups proceed during encoding")
+
+
+def test_racing_inserts_share_one_id():
+    """Two documents encoding the same new clause at once end up with one canonical id."""
+    registry = ClauseRegistry()
+    both_encoding = threading.Barrier(2, timeout=5)
+    encoder = CountingEncoder()
+
+    def encode(texts):
+        both_encoding.wait()  # Fails if encoding were serialised by the registry lock
+        return encoder(texts)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.embed([FREE_LOOK], encode)))
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert encoder.encoded == 2 and len(results) == 2
+    assert [r.ids.tolist() for r in results] == [[0], [0]] and len(registry) == 1
+    assert registry.stats()["exact_duplicates"] == 1
+    print("✅ Concurrent duplicates resolve to one canonical clause")
+
+
+def test_index_overhead_counted():
+    """The dedup index is part of nbytes and stays well below the embeddings it saves."""
+    registry = ClauseRegistry()
+    texts = [f"Clause {i}: {GRIEVANCE} Section {i * 7}." for i in range(1000)]
+    registry.embed(texts, CountingEncoder())
+    stats = registry.stats()
+    per_clause = stats["index_bytes"] / stats["canonical_clauses"]
+    print(f"Index: {stats['index_bytes'] / 1024:.0f} KiB, {per_clause:.0f} bytes per clause")
+    assert stats["canonical_clauses"] == 1000
+    assert registry.nbytes >= stats["embedding_bytes"] + stats["index_bytes"]
+    assert per_clause < EMBEDDING_DIM * 4 / 2, "index costs more than half an embedding per clause"
+    print("✅ Index overhead counted and compact")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Near-duplicates share embeddings", test_near_duplicates_share_embeddings),
+        ("Different numbers stay separate", test_different_numbers_stay_separate),
+        ("Search matches direct scoring", test_search_matches_direct_scoring),
+        ("Failed encoding rolls back", test_failed_encoding_rolls_back),
+        ("Encoding does not block lookups", test_encoding_does_not_block_lookups),
+        ("Racing inserts share one id", test_racing_inserts_share_one_id),
+        ("Index overhead counted", test_index_overhead_counted)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
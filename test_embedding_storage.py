@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Recall test for the low-precision clause embedding storage modes
+"""
+
+import torch
+from embedding_store import ClauseEmbeddings, LazyClauseEmbeddings, STORAGE_MODES
+
+# Mirrors Config.TOP_K_CLAUSES in insurance_api.py
+TOP_K_CLAUSES = 3
+EMBEDDING_DIM = 384
+NUM_CLAUSES = 1000
+NUM_QUERIES = 200
+
+MIN_RECALL = {
+    "fp32": 1.0,
+    "fp16": 0.99,
+    "int8": 0.95,
+    "binary": 0.9,
+    "pq": 0.9,
+}
+
+
+def make_corpus(seed: int = 0):
+    """Build clustered unit vectors shaped like MiniLM clause embeddings."""
+    generator = torch.Generator().manual_seed(seed)
+    topics = torch.randn(50, EMBEDDING_DIM, generator=generator)
+    clause_topics = torch.randint(0, 50, (NUM_CLAUSES,), generator=generator)
+    clauses = topics[clause_topics] + 0.8 * torch.randn(NUM_CLAUSES, EMBEDDING_DIM, generator=generator)
+    query_topics = torch.randint(0, 50, (NUM_QUERIES,), generator=generator)
+    queries = topics[query_topics] + 0.8 * torch.randn(NUM_QUERIES, EMBEDDING_DIM, generator=generator)
+    return (torch.nn.functional.normalize(clauses, dim=-1),
+            torch.nn.functional.normalize(queries, dim=-1))
+
+
+def recall_at_k(storage: str, clauses: torch.Tensor, queries: torch.Tensor) -> float:
+    """Fraction of the exact fp32 top-k clauses returned by the storage mode."""
+    store = ClauseEmbeddings(clauses, storage=storage)
+    hits = 0
+    for query in queries:
+        exact = set(torch.argsort(clauses @ query, descending=True)[:TOP_K_CLAUSES].tolist())
+        _, found = store.search(query, TOP_K_CLAUSES, rerank_fn=lambda ids: clauses[ids])
+        hits += len(exact & set(found.tolist()))
+    return hits / (len(queries) * TOP_K_CLAUSES)
+
+
+def test_recall_against_fp32():
+    """Each storage mode keeps recall@TOP_K_CLAUSES close to fp32."""
+    clauses, queries = make_corpus()
+    for storage in STORAGE_MODES:
+        recall = recall_at_k(storage, clauses, queries)
+        print(f"{storage:>6}: recall@{TOP_K_CLAUSES} = {recall:.3f}")
+        assert recall >= MIN_RECALL[storage], f"{storage} recall {recall:.3f} below {MIN_RECALL[storage]}"
+    print("✅ Recall within tolerance for all storage modes")
+
+
+def test_storage_size():
+    """Quantised modes store fewer bytes than fp32."""
+    clauses, _ = make_corpus()
+    sizes = {storage: ClauseEmbeddings(clauses, storage=storage).nbytes for storage in STORAGE_MODES}
+    for storage, size in sizes.items():
+        print(f"{storage:>6}: {size / 1024:.1f} KiB")
+    assert sizes["fp16"] < sizes["fp32"]
+    assert sizes["int8"] < sizes["fp16"]
+    assert sizes["binary"] < sizes["int8"]
+    assert sizes["pq"] < sizes["fp32"]
+    print("✅ Storage sizes shrink with precision")
+
+
+def test_lazy_store_encodes_shortlist_only():
+    """The prefilter store encodes only candidate clauses, each once, and ranks them exactly."""
+    clauses, queries = make_corpus()
+    encoded = []
+
+    def encode(ids):
+        encoded.extend(ids)
+        return clauses[ids]
+
+    store = LazyClauseEmbeddings(NUM_CLAUSES, encode)
+    candidates = torch.arange(0, NUM_CLAUSES, 10)
+    for query in queries[:20]:
+        scores, found = store.search(query, TOP_K_CLAUSES, candidates=candidates)
+        exact = candidates[torch.argsort(clauses[candidates] @ query, descending=True)[:TOP_K_CLAUSES]]
+        assert found.tolist() == exact.tolist()
+    print(f"Encoded {len(encoded)} of {NUM_CLAUSES} clauses, {store.nbytes / 1024:.1f} KiB")
+    assert sorted(encoded) == candidates.tolist(), "clauses encoded more than once or outside the shortlist"
+    assert store.nbytes == len(candidates) * EMBEDDING_DIM * 4
+    print("✅ Only shortlisted clauses are embedded")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Recall against fp32", test_recall_against_fp32),
+        ("Storage size", test_storage_size),
+        ("Lazy prefilter store", test_lazy_store_encodes_shortlist_only)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
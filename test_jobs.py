@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for background claim jobs and their progress stream
+"""
+
+import asyncio
+import threading
+import time
+
+from jobs import COMPLETED, FAILED, JobManager, JobQueueFull, report_progress, stream_events
+
+
+def wait_until_done(job, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.done, f"job still {job.status}"
+
+
+def test_progress_and_result():
+    """Stages reported inside a job show up as events before the result."""
+    manager = JobManager(workers=1)
+
+    def pipeline(pages):
+        for page in range(1, pages + 1):
+            report_progress("page_extracted", page=page, pages=pages)
+        return {"Decision": "Approved"}
+
+    job = manager.submit(pipeline, 2)
+    wait_until_done(job)
+    stages = [event["stage"] for event in job.events]
+    print(f"Events: {stages}")
+    assert stages == ["queued", "running", "page_extracted", "page_extracted", COMPLETED]
+    assert job.summary()["result"] == {"Decision": "Approved"}
+    report_progress("ignored")  # No job in this context
+    print("✅ Progress events and result recorded")
+
+
+def test_failures_are_reported():
+    """Exceptions and error results both finish the job as failed."""
+    manager = JobManager(workers=1)
+    raising = manager.submit(lambda: 1 / 0)
+    erroring = manager.submit(lambda: {"error": "No content extracted from document"})
+    wait_until_done(raising)
+    wait_until_done(erroring)
+    assert raising.status == FAILED and "Processing failed" in raising.result["error"]
+    assert erroring.status == FAILED
+    print("✅ Failed jobs keep their error")
+
+
+def test_queue_limit():
+    """Submissions beyond max_pending unfinished jobs are rejected."""
+    manager = JobManager(workers=1, max_pending=2)
+    release = threading.Event()
+    first = manager.submit(release.wait)
+    manager.submit(release.wait)
+    try:
+        manager.submit(release.wait)
+        assert False, "expected JobQueueFull"
+    except JobQueueFull:
+        pass
+    release.set()
+    wait_until_done(first)
+    print("✅ Queue rejects work beyond its limit")
+
+
+def test_retention():
+    """Finished jobs expire after the retention period."""
+    manager = JobManager(workers=1, retention_seconds=0.05)
+    job = manager.submit(lambda: {"Decision": "Approved"})
+    wait_until_done(job)
+    assert manager.get(job.id) is job
+    time.sleep(0.1)
+    assert manager.get(job.id) is None
+    print("✅ Finished jobs expire")
+
+
+def test_event_stream():
+    """The SSE stream replays progress from a cursor and ends with the result."""
+    manager = JobManager(workers=1)
+    release = threading.Event()
+
+    def pipeline():
+        release.wait()
+        report_progress("search_done", relevant_clauses=3)
+        return {"Decision": "Approved"}
+
+    job = manager.submit(pipeline)
+
+    async def collect(cursor):
+        chunks = []
+        async for chunk in stream_events(job, cursor, heartbeat_seconds=1.0):
+            chunks.append(chunk)
+            release.set()
+        return chunks
+
+    chunks = asyncio.run(collect(0))
+    assert chunks[0].startswith("id: 0\nevent: progress")
+    assert chunks[-1].startswith("event: result") and '"Approved"' in chunks[-1]
+    assert any('"search_done"' in chunk for chunk in chunks)
+
+    resumed = asyncio.run(collect(len(job.events) - 1))
+    assert len(resumed) == 2 and f'"stage": "{COMPLETED}"' in resumed[0]
+    print("✅ Event stream delivers progress then the result")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Progress and result", test_progress_and_result),
+        ("Failures are reported", test_failures_are_reported),
+        ("Queue limit", test_queue_limit),
+        ("Retention", test_retention),
+        ("Event stream", test_event_stream)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for tiered language detection: script ranges, stopwords, langdetect
+fallback, aliases and the memo
+"""
+
+from langdetect import DetectorFactory
+
+import language_detection
+from language_detection import LanguageDetector, detect_by_stopwords
+
+SUPPORTED = ['en', 'es', 'fr', 'de', 'hi', 'zh', 'ar', 'ru', 'ja', 'pt', 'it', 'ko']
+
+DetectorFactory.seed = 0
+
+
+def test_script_tier():
+    """Non-Latin scripts are decided from Unicode ranges; any kana means Japanese."""
+    detector = LanguageDetector(SUPPORTED)
+    assert detector.detect_with_method("46 वर्षीय पुरुष, पुणे में घुटने की सर्जरी") == ("hi", "script")
+    assert detector.detect_with_method("我父亲的透析治疗费用") == ("zh", "script")
+    assert detector.detect_with_method("父の透析治療の費用") == ("ja", "script")
+    assert detector.detect_with_method("Мужчина 46 лет, операция на колене") == ("ru", "script")
+    print("✅ Scripts decided from code point ranges")
+
+
+def test_stopword_tier():
+    """Clear-cut Latin text is decided by its function words."""
+    detector = LanguageDetector(SUPPORTED)
+    assert detector.detect_with_method("Ist die Operation in meiner Police enthalten und wurde sie bezahlt?") == ("de", "stopwords")
+    assert detector.detect_with_method("Tengo 46 años y el seguro fue contratado hasta marzo") == ("es", "stopwords")
+    assert detector.detect_with_method("Is cataract surgery covered under my policy?") == ("en", "stopwords")
+    print("✅ Function words decide clear-cut Latin text")
+
+
+def test_english_not_portuguese():
+    """English words that are also short Portuguese or Spanish words do not count."""
+    detector = LanguageDetector(SUPPORTED)
+    assert detect_by_stopwords("Do I get cover as an outpatient") is None
+    assert detector.detect_with_method("Do I get cover as an outpatient?")[0] == "en"
+    assert detector.detect_with_method("What do I do as a diabetic with a claim?") == ("en", "stopwords")
+    print("✅ English questions stay English")
+
+
+def test_shared_words_ignored():
+    """Words shared between the supported languages never decide on their own."""
+    for text in ("con la mi", "de la para", "in o as do", "del con una", "per la in"):
+        result = detect_by_stopwords(text)
+        print(f"{text!r} -> {result}")
+        assert result is None
+    print("✅ Shared words ignored")
+
+
+def test_langdetect_fallback():
+    """Ambiguous Latin text falls through to langdetect."""
+    detector = LanguageDetector(SUPPORTED)
+    language, method = detector.detect_with_method("Reclamación por accidente, cirugía de rodilla")
+    assert (language, method) == ("es", "langdetect"), (language, method)
+    assert detector.detect_with_method("ok") == ("en", "default")
+    print("✅ Ambiguous text falls through to langdetect")
+
+
+def test_aliases_and_unsupported():
+    """langdetect's regional codes are aliased and unsupported languages default."""
+    original = language_detection.detect
+    try:
+        language_detection.detect = lambda text: "zh-cn"
+        assert language_detection.detect_with_langdetect("anything") == "zh"
+        assert LanguageDetector(SUPPORTED).detect_with_method("xyz qrs") == ("zh", "langdetect")
+
+        language_detection.detect = lambda text: "nl"
+        assert LanguageDetector(SUPPORTED).detect_with_method("xyz qrs") == ("en", "langdetect")
+        assert LanguageDetector(SUPPORTED, default="hi").detect_with_method("xyz qrs") == ("hi", "langdetect")
+
+        def fail(text):
+            raise ValueError("no features")
+        language_detection.detect = fail
+        assert LanguageDetector(SUPPORTED).detect_with_method("xyz qrs") == ("en", "default")
+    finally:
+        language_detection.detect = original
+    print("✅ Aliases mapped, unsupported languages defaulted")
+
+
+def test_memo():
+    """Texts that normalise alike share one memo entry."""
+    detector = LanguageDetector(SUPPORTED, cache_size=8)
+    first = detector.detect("Is cataract surgery covered under my policy?")
+    second = detector.detect("  Is cataract   surgery covered under my policy!!")
+    info = detector.cache_info()
+    print(f"Cache: {info}")
+    assert first == second == "en"
+    assert (info.hits, info.misses) == (1, 1)
+    print("✅ Normalised texts memoised")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Script tier", test_script_tier),
+        ("Stopword tier", test_stopword_tier),
+        ("English not Portuguese", test_english_not_portuguese),
+        ("Shared words ignored", test_shared_words_ignored),
+        ("langdetect fallback", test_langdetect_fallback),
+        ("Aliases and unsupported", test_aliases_and_unsupported),
+        ("Memo", test_memo)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for BM25 clause scoring and reciprocal rank fusion
+"""
+
+from lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+CLAUSES = [
+    "Knee surgery is covered after a 24-month waiting period.",
+    "Dental treatment is excluded from the policy.",
+    "Cataract surgery is covered after a 36-month waiting period.",
+    "Maternity care is covered after a 9-month waiting period for the insured and the spouse of the insured.",
+    "Cashless treatment is available at network hospitals in Pune.",
+]
+
+
+def test_tokenize():
+    """Terms are lowercased, stopwords dropped and hyphenated terms kept whole and split."""
+    tokens = tokenize("The 36-month waiting period for Pre-existing diseases")
+    print(f"Tokens: {tokens}")
+    assert "the" not in tokens and "for" not in tokens
+    assert {"36-month", "36", "month", "pre-existing", "pre", "existing", "waiting"} <= set(tokens)
+    print("✅ Tokens keep hyphenated terms")
+
+
+def test_rare_terms_score_higher():
+    """A term in one clause outweighs a term shared by many."""
+    index = BM25Index(CLAUSES)
+    rare = index.scores("dental")
+    common = index.scores("covered")
+    print(f"dental: {rare}, covered: {common}")
+    assert list(rare) == [1]
+    assert set(common) == {0, 2, 3}
+    assert rare[1] > max(common.values())
+    print("✅ Rare terms carry more weight")
+
+
+def test_length_normalization():
+    """The same match scores lower in a longer clause."""
+    index = BM25Index(CLAUSES)
+    scores = index.scores("waiting period")
+    print(f"Scores: {scores}")
+    assert scores[0] > scores[3], "long clause should score below short clause"
+    print("✅ Longer clauses are normalised down")
+
+
+def test_top_and_no_overlap():
+    """top() ranks the exact-term clause first; unrelated queries return nothing."""
+    index = BM25Index(CLAUSES)
+    assert index.top("cataract surgery 36-month", 2) == [2, 0]
+    assert index.top("cashless Pune", 1) == [4]
+    assert index.top("xyzzy", 3) == [] and index.scores("the of and") == {}
+    assert len(BM25Index([])) == 0 and BM25Index([]).top("knee", 3) == []
+    print("✅ Ranking and empty results")
+
+
+def test_reciprocal_rank_fusion():
+    """Items ranked well in both lists win; single-list items follow by rank."""
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+    print(f"Fused: {fused}")
+    assert fused[0] == 1, "ranked 1st and 2nd should beat 3rd and 1st"
+    assert fused[1] == 3
+    assert set(fused) == {1, 2, 3, 4} and fused.index(2) < fused.index(4)
+    assert reciprocal_rank_fusion([]) == [] and reciprocal_rank_fusion([[7]]) == [7]
+    print("✅ Rank fusion merges both lists")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Tokenize", test_tokenize),
+        ("Rare terms", test_rare_terms_score_higher),
+        ("Length normalization", test_length_normalization),
+        ("Top and no overlap", test_top_and_no_overlap),
+        ("Reciprocal rank fusion", test_reciprocal_rank_fusion)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for JSON log formatting, per-request sampling and the dropping log queue
+"""
+
+import json
+import logging
+import queue
+import sys
+
+from log_config import DroppingQueueHandler, JsonFormatter, SamplingFilter, sampled_request
+
+SAMPLED = {"sample": True}
+
+
+class ListHandler(logging.Handler):
+    """Collects records that pass the handler's filters."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_logger(name: str, rate: float):
+    handler = ListHandler()
+    handler.addFilter(SamplingFilter(rate))
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger, handler
+
+
+def test_json_formatter():
+    """Records become one JSON object with extra fields; the sample flag is dropped."""
+    record = logging.LogRecord("claims", logging.INFO, __file__, 1, "Processed %s", ("policy.pdf",), None)
+    record.decision = "Approved"
+    record.sample = True
+    entry = json.loads(JsonFormatter().format(record))
+    print(f"Entry: {entry}")
+    assert entry["message"] == "Processed policy.pdf" and entry["level"] == "INFO"
+    assert entry["decision"] == "Approved" and "sample" not in entry
+
+    try:
+        raise ValueError("bad page")
+    except ValueError:
+        record = logging.LogRecord("claims", logging.ERROR, __file__, 1, "Failed", (), sys.exc_info())
+    assert "ValueError: bad page" in json.loads(JsonFormatter().format(record))["exc_info"]
+    print("✅ JSON lines carry extra fields and exceptions")
+
+
+def test_sampling_is_per_request():
+    """Every sampled record of a request is kept, or none of them is."""
+    logger, handler = make_logger("test_sampling_request", 0.5)
+    kept = []
+    for request in range(200):
+        before = len(handler.records)
+        with sampled_request(0.5):
+            for stage in range(5):
+                logger.info(f"request {request} stage {stage}", extra=SAMPLED)
+            logger.info(f"request {request} done")  # Not sampled: always kept
+        kept.append(len(handler.records) - before)
+    print(f"Records kept per request: {sorted(set(kept))}")
+    assert set(kept) == {1, 6}, "requests were partially sampled"
+    print("✅ Requests are sampled whole")
+
+
+def test_sampling_outside_request():
+    """Outside a request the filter's own rate applies per record."""
+    logger, handler = make_logger("test_sampling_none", 0.0)
+    logger.info("dropped", extra=SAMPLED)
+    logger.info("kept")
+    assert [record.getMessage() for record in handler.records] == ["kept"]
+    with sampled_request(1.0):
+        logger.info("kept in a fully sampled request", extra=SAMPLED)
+    assert len(handler.records) == 2
+    print("✅ Unscoped records use the filter rate")
+
+
+def test_dropping_queue_handler():
+    """A full log queue drops and counts records instead of blocking."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test_dropping_queue")
+    logger.handlers = [handler]
+    logger.propagate = False
+    for i in range(5):
+        logger.warning(f"record {i}")
+    assert handler.queue.qsize() == 2 and handler.dropped == 3
+    print("✅ Full queue drops records")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("JSON formatter", test_json_formatter),
+        ("Per-request sampling", test_sampling_is_per_request),
+        ("Sampling outside a request", test_sampling_outside_request),
+        ("Dropping queue handler", test_dropping_queue_handler)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
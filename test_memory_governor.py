@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory budget governor
+"""
+
+import threading
+import time
+
+from memory_governor import MemoryBudgetExceeded, MemoryGovernor
+
+MiB = 2 ** 20
+
+
+class FakeProcess:
+    """Resident memory made up of named caches."""
+
+    def __init__(self, **caches):
+        self.caches = dict(caches)
+        self.base = 100 * MiB
+
+    def rss(self) -> int:
+        return self.base + sum(self.caches.values())
+
+    def evictor(self, name):
+        def evict(nbytes):
+            freed = min(nbytes, self.caches[name])
+            self.caches[name] -= freed
+            return freed
+        return evict
+
+
+def make_governor(process, budget_mib, timeout=0.2):
+    governor = MemoryGovernor(budget_mib * MiB, queue_timeout=timeout, rss_fn=process.rss)
+    for name in process.caches:
+        governor.register(name, lambda name=name: process.caches[name], process.evictor(name))
+    return governor
+
+
+def test_evicts_in_priority_order():
+    """Caches registered first are evicted first, and only as much as needed."""
+    process = FakeProcess(lexical=20 * MiB, embeddings=50 * MiB, translators=300 * MiB)
+    governor = make_governor(process, budget_mib=400)
+    with governor.admit("policy.pdf", 30 * MiB):
+        pass
+    print(f"Caches after admission: { {k: v // MiB for k, v in process.caches.items()} }")
+    # 470 MiB resident + 30 MiB document needs 100 MiB back
+    assert process.caches["lexical"] == 0
+    assert process.caches["embeddings"] == 0
+    assert process.caches["translators"] == 270 * MiB
+    print("✅ Eviction follows priority order")
+
+
+def test_queues_until_memory_is_released():
+    """A document that does not fit waits for in-flight work, then runs."""
+    process = FakeProcess()
+    governor = make_governor(process, budget_mib=200, timeout=5.0)
+    started = threading.Event()
+    order = []
+
+    def first():
+        with governor.admit("first.pdf", 80 * MiB):
+            started.set()
+            time.sleep(0.2)
+            order.append("first done")
+
+    worker = threading.Thread(target=first)
+    worker.start()
+    started.wait()
+    with governor.admit("second.pdf", 80 * MiB):
+        order.append("second admitted")
+    worker.join()
+    assert order == ["first done", "second admitted"], order
+    assert governor.queued == 1 and governor.inflight_bytes == 0
+    print("✅ Document queued until memory was released")
+
+
+def test_rejects_after_timeout():
+    """When memory never frees up, new documents are rejected."""
+    process = FakeProcess()
+    governor = make_governor(process, budget_mib=200, timeout=0.1)
+    with governor.admit("large.pdf", 90 * MiB):
+        try:
+            with governor.admit("another.pdf", 90 * MiB):
+                assert False, "expected MemoryBudgetExceeded"
+        except MemoryBudgetExceeded as e:
+            print(f"Rejected: {e}")
+    assert governor.rejected == 1
+    print("✅ Document rejected after waiting")
+
+
+def test_admits_when_idle():
+    """With nothing in flight a document is admitted even over budget."""
+    process = FakeProcess(models=500 * MiB)
+    governor = MemoryGovernor(300 * MiB, queue_timeout=0.1, rss_fn=process.rss)
+    governor.register("models", lambda: process.caches["models"])
+    with governor.admit("policy.pdf", 10 * MiB):
+        usage = governor.usage()
+    assert usage["inflight_documents"] == 1 and usage["inflight_bytes"] == 10 * MiB
+    assert usage["components"] == {"models": 500 * MiB}
+    print("✅ Idle service always makes progress")
+
+
+def test_eviction_does_not_hold_lock():
+    """Admissions and releases proceed while a slow eviction callback runs."""
+    process = FakeProcess(lexical=50 * MiB)
+    governor = MemoryGovernor(120 * MiB, queue_timeout=0.1, rss_fn=process.rss)
+    evicting, release = threading.Event(), threading.Event()
+
+    def slow_evict(nbytes):
+        evicting.set()
+        release.wait(5)
+        return process.evictor("lexical")(nbytes)
+
+    governor.register("lexical", lambda: process.caches["lexical"], slow_evict)
+    enforcer = threading.Thread(target=governor.enforce)
+    enforcer.start()
+    try:
+        assert evicting.wait(5)
+        done, admitted = threading.Event(), []
+
+        def admit():
+            # Its eviction is skipped, not queued, and with nothing in flight it is admitted
+            governor.enforce()
+            with governor.admit("policy.pdf", 10 * MiB):
+                admitted.append(governor.usage()["inflight_documents"])
+            done.set()
+
+        threading.Thread(target=admit).start()
+        assert done.wait(2), "governor lock held during eviction"
+        assert admitted == [1]
+    finally:
+        release.set()
+        enforcer.join()
+    assert process.caches["lexical"] == 20 * MiB
+    print("✅ Eviction runs outside the governor lock")
+
+
+def test_unknown_component_in_eviction_order():
+    """A misspelled eviction order entry names the valid components."""
+    governor = MemoryGovernor(100 * MiB)
+    components = {"lexical_cache": (lambda: 0, lambda n: 0), "models": (lambda: 0, None)}
+    try:
+        governor.register_components(components, ["lexical_cache", "embeddings_cache"])
+        assert False, "expected ValueError"
+    except ValueError as e:
+        print(f"Error: {e}")
+        assert "embeddings_cache" in str(e) and "lexical_cache" in str(e)
+    governor.register_components(components, ["lexical_cache"])
+    assert list(governor.component_sizes()) == ["lexical_cache", "models"]
+    print("✅ Unknown eviction order entries are reported clearly")
+
+
+def test_models_over_budget_keep_caches():
+    """When evicting everything cannot reach the budget, caches are left alone."""
+    process = FakeProcess(lexical=20 * MiB, models=500 * MiB)
+    governor = MemoryGovernor(300 * MiB, queue_timeout=0.1, rss_fn=process.rss)
+    governor.register("lexical", lambda: process.caches["lexical"], process.evictor("lexical"))
+    governor.register("models", lambda: process.caches["models"])
+    assert governor.enforce() == 0 and governor.enforce() == 0
+    with governor.admit("policy.pdf", 10 * MiB):
+        pass
+    assert process.caches["lexical"] == 20 * MiB
+
+    # Once the models fit, caches are evicted again
+    process.caches["models"] = 190 * MiB
+    assert governor.enforce() == 10 * MiB and process.caches["lexical"] == 10 * MiB
+    print("✅ Caches kept when eviction cannot help")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Eviction priority", test_evicts_in_priority_order),
+        ("Queueing", test_queues_until_memory_is_released),
+        ("Rejection", test_rejects_after_timeout),
+        ("Idle admission", test_admits_when_idle),
+        ("Eviction outside the lock", test_eviction_does_not_hold_lock),
+        ("Unknown eviction order entry", test_unknown_component_in_eviction_order),
+        ("Models over budget", test_models_over_budget_keep_caches)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics registry and timing spans
+"""
+
+from metrics import MetricsRegistry, collect_timings, span, STAGE_SECONDS
+
+
+def test_counter_render():
+    """Counters render one sample per label set with HELP and TYPE lines."""
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests by outcome", ("outcome",))
+    requests.inc(outcome="success")
+    requests.inc(2, outcome="success")
+    requests.inc(outcome="error")
+    text = registry.render()
+    print(text)
+    assert "# HELP demo_requests_total Requests by outcome" in text
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{outcome="success"} 3' in text
+    assert 'demo_requests_total{outcome="error"} 1' in text
+    print("✅ Counter rendered")
+
+
+def test_histogram_buckets():
+    """Histogram buckets are cumulative and end with +Inf, count and sum."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 2.0):
+        latency.observe(value, stage="ocr")
+    lines = registry.render().splitlines()
+    print("\n".join(lines))
+    assert 'demo_seconds_bucket{stage="ocr",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="ocr",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{stage="ocr",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{stage="ocr"} 4' in lines
+    assert 'demo_seconds_sum{stage="ocr"} 3.05' in lines
+    print("✅ Histogram buckets rendered")
+
+
+def test_callback_gauges():
+    """Callback gauges are evaluated on render; single-label callbacks may return a dict."""
+    registry = MetricsRegistry()
+    state = {"pending": 2, "components": {"lexical_cache": 1024, "models": 4096}}
+    registry.gauge("demo_pending", "Pending jobs", callback=lambda: state["pending"])
+    registry.gauge("demo_bytes", "Bytes per component", ("component",),
+                   callback=lambda: state["components"])
+    text = registry.render()
+    assert "demo_pending 2" in text
+    assert 'demo_bytes{component="lexical_cache"} 1024' in text
+    assert 'demo_bytes{component="models"} 4096' in text
+
+    state["pending"] = 0
+    assert "demo_pending 0" in registry.render()
+    print("✅ Callback gauges evaluated on render")
+
+
+def test_span_records_once():
+    """A span feeds the stage histogram and the request's Timings once per call."""
+    before = STAGE_SECONDS.get(stage="test_stage")
+    with collect_timings() as timings:
+        with span("test_stage"):
+            pass
+    assert STAGE_SECONDS.get(stage="test_stage") == before + 1
+    assert timings.as_dict()["test_stage"]["calls"] == 1
+    print("✅ Span recorded once")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Counter render", test_counter_render),
+        ("Histogram buckets", test_histogram_buckets),
+        ("Callback gauges", test_callback_gauges),
+        ("Span records once", test_span_records_once)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the end-to-end claim result cache
+"""
+
+import threading
+import time
+
+from result_cache import BYPASS, HIT, MISS, SHARED, ResultCache, make_key
+
+
+def test_single_flight():
+    """Concurrent identical requests run the computation exactly once."""
+    cache = ResultCache()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(threading.get_ident())
+        release.wait(5)
+        return {"Decision": "Approved"}
+
+    results = []
+    started = threading.Barrier(9)
+
+    def request():
+        started.wait()
+        results.append(cache.get_or_compute("claim", compute))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    # Let every caller reach the cache before the leader finishes
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    statuses = sorted(status for _, status in results)
+    print(f"Statuses: {statuses}")
+    assert len(calls) == 1, f"compute ran {len(calls)} times"
+    assert statuses.count(MISS) == 1 and statuses.count(SHARED) == 7
+    assert all(value == {"Decision": "Approved"} for value, _ in results)
+    assert cache.get_or_compute("claim", compute)[1] == HIT
+    print("✅ Identical concurrent claims share one run")
+
+
+def test_errors_are_shared_not_cached():
+    """A failing computation raises and error results are returned but not cached."""
+    cache = ResultCache()
+
+    def failing():
+        raise RuntimeError("model unavailable")
+
+    try:
+        cache.get_or_compute("claim", failing)
+        assert False, "expected the error to propagate"
+    except RuntimeError:
+        pass
+    value, status = cache.get_or_compute("claim", lambda: {"error": "No content"},
+                                         cacheable=lambda r: "error" not in r)
+    assert status == MISS and len(cache) == 0
+    print("✅ Failures and error results are not cached")
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are recomputed."""
+    cache = ResultCache(ttl_seconds=0.05)
+    cache.put("claim", {"Decision": "Approved"})
+    assert cache.get("claim") == {"Decision": "Approved"}
+    time.sleep(0.1)
+    assert cache.get("claim") is None and len(cache) == 0
+    _, status = cache.get_or_compute("claim", lambda: {"Decision": "Rejected"})
+    assert status == MISS
+    print("✅ Expired entries are recomputed")
+
+
+def test_lru_eviction():
+    """Beyond max_entries the least recently used entry is evicted."""
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    print("✅ Least recently used entry evicted")
+
+
+def test_bypass():
+    """Bypass recomputes and refreshes the stored entry."""
+    cache = ResultCache()
+    cache.put("claim", {"Decision": "Approved"})
+    value, status = cache.get_or_compute("claim", lambda: {"Decision": "Rejected"}, bypass=True)
+    assert status == BYPASS and cache.get("claim") == value
+    print("✅ Bypass refreshes the entry")
+
+
+def test_key_normalization():
+    """Whitespace and Unicode width variants share a key; case, language and file type do not."""
+    key = make_key("doc", ".pdf", "46M knee surgery, Pune", "en", "v1")
+    assert make_key("doc", ".pdf", "  46M   knee surgery,\nPune ", "en", "v1") == key
+    assert make_key("doc", ".pdf", "４６M knee surgery, Pune", "en", "v1") == key  # Full-width digits
+    assert make_key("doc", ".pdf", "46m knee surgery, pune", "en", "v1") != key
+    assert make_key("doc", ".pdf", "46M knee surgery, Pune", "hi", "v1") != key
+    assert make_key("other", ".pdf", "46M knee surgery, Pune", "en", "v1") != key
+    assert make_key("doc", ".pdf", "46M knee surgery, Pune", "en", "v2") != key
+    assert make_key("doc", ".eml", "46M knee surgery, Pune", "en", "v1") != key  # Same bytes, other extractor
+    assert make_key("doc", ".PDF", "46M knee surgery, Pune", "en", "v1") == key
+    print("✅ Keys normalise whitespace and Unicode only")
+
+
+def test_nbytes_tracking():
+    """nbytes follows puts, replacements, expiry and eviction without rescanning entries."""
+    cache = ResultCache(max_entries=2, ttl_seconds=0.05)
+    cache.put("a", {"Decision": "Approved"})
+    size = cache.nbytes
+    assert size == len('{"Decision": "Approved"}')
+    cache.put("a", {"Decision": "Rejected"})
+    assert cache.nbytes == len('{"Decision": "Rejected"}')
+    cache.put("b", [1, 2, 3])
+    cache.put("c", "x")  # Evicts "a" by LRU
+    assert cache.nbytes == len("[1, 2, 3]") + len('"x"')
+    assert cache.evict(1) == len("[1, 2, 3]") and cache.nbytes == len('"x"')
+    time.sleep(0.1)
+    assert cache.get("c") is None and cache.nbytes == 0
+    cache.put("d", 1)
+    cache.clear()
+    assert cache.nbytes == 0
+    print("✅ Cache size tracked incrementally")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        ("Single flight", test_single_flight),
+        ("Errors shared, not cached", test_errors_are_shared_not_cached),
+        ("TTL expiry", test_ttl_expiry),
+        ("LRU eviction", test_lru_eviction),
+        ("Bypass", test_bypass),
+        ("Key normalization", test_key_normalization),
+        ("Size tracking", test_nbytes_tracking)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            test_func()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {e}")
+        print("-" * 40)
+
+    print(f"\n📊 Test Results: {passed}/{len(tests)} tests passed")
+
+
+if __name__ == "__main__":
+    main()